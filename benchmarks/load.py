@@ -0,0 +1,443 @@
+"""Concurrent-session load test against a running dashboard server.
+
+Every virtual user opens its own websocket session, the way a browser tab
+does, and walks the real navigation flow with Streamlit's protocol
+messages (``BackMsg`` in, ``ForwardMsg`` out):
+
+    Home        first page load
+    districts   a random district in the manual picker, then its button
+    simulation  GO TO SIMULATION
+    choices     a random scenario button
+    choices     one rerun per ticked level / percentage checkbox
+    runit       RUN SIMULATION
+
+then closes the session and starts over with another random selection.
+A step's latency runs from sending the interaction to the ``script_finished``
+of the page it lands on; users think for an exponentially distributed time
+(``--think`` seconds on average) between steps. Only the websocket side of
+a browser is simulated: static files, component iframes and media are not
+fetched.
+
+Concurrency is ramped in stages (``--users``), each running for
+``--duration`` seconds. Per stage the test reports throughput (steps and
+walks per second), p50/p95/p99 latency over all steps and per page, errors
+(exceptions shown on a page, timeouts, dropped sessions) and the server's
+resident memory, sampled every ``RSS_INTERVAL_S`` seconds from /proc
+(Linux). The ramp stops at the first stage where latency breaks down: p95
+above ``--slo-ms``, above ``--factor`` times the first stage's p95, or more
+than ``MAX_ERROR_RATE`` of the steps failing.
+
+By default a server is started on a free port with an empty scratch result
+cache, so the first walks do the real work; ``--url`` (and ``--pid`` for
+memory) points the test at a server that is already running instead.
+
+    python -m benchmarks.load                              # 1..32 users, 20 s each
+    python -m benchmarks.load --users 4 8 16 --duration 60 --think 2
+    python -m benchmarks.load --url http://localhost:8501 --pid 4242
+
+Run from the repository root. Results are written as JSON with the memory
+timeline.
+"""
+import argparse
+import asyncio
+import contextlib
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+from pathlib import Path
+
+import numpy as np
+import streamlit as st
+import websockets
+from streamlit.proto.BackMsg_pb2 import BackMsg
+from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+
+ROOT = Path(__file__).resolve().parent.parent
+RESULTS = ROOT / "benchmarks" / "results" / "load.json"
+
+USERS = [1, 2, 4, 8, 16, 32]
+DURATION_S = 20.0
+THINK_S = 1.0
+STEP_TIMEOUT_S = 60.0
+SLO_MS = 2000.0
+# p95 growth over the single-user stage that counts as breaking down
+FACTOR = 4.0
+MAX_ERROR_RATE = 0.01
+RSS_INTERVAL_S = 0.5
+STARTUP_TIMEOUT_S = 60.0
+
+DISTRICT_PICKER = "Or pick a district manually:"
+LEVELS = ["Level 1", "Level 2", "Level 3"]
+PERCENTAGES = ["25%", "50%", "75%", "100%"]
+
+FINISHED = ForwardMsg.FINISHED_SUCCESSFULLY
+FRAGMENT_FINISHED = ForwardMsg.FINISHED_FRAGMENT_RUN_SUCCESSFULLY
+COMPILE_ERROR = ForwardMsg.FINISHED_WITH_COMPILE_ERROR
+
+
+class StepError(Exception):
+    pass
+
+
+# --- ONE SESSION ---
+class Session:
+    """One browser tab: its websocket, the page it is on and that page's widgets."""
+
+    def __init__(self, ws, timeout=STEP_TIMEOUT_S):
+        self.ws = ws
+        self.timeout = timeout
+        self.page_hash = ""
+        self.widgets = {}  # label -> (widget id, element proto, fragment id)
+        self.values = {}   # widget id -> value the frontend sends back with every rerun
+
+    def options(self, label):
+        return list(self.widgets[label][1].options)
+
+    def labels(self, prefix):
+        return [label for label in self.widgets if label.startswith(prefix)]
+
+    def _state(self, label):
+        if label not in self.widgets:
+            raise StepError(f"no widget {label!r} on the page")
+        widget_id, _, fragment_id = self.widgets[label]
+        return widget_id, fragment_id
+
+    async def rerun(self, values=None, trigger=None, navigate=False):
+        """Send one interaction and read up to the end of the run; returns milliseconds."""
+        msg = BackMsg()
+        client = msg.rerun_script
+        client.page_script_hash = self.page_hash
+        fragment = None
+        for label, value in (values or {}).items():
+            widget_id, fragment = self._state(label)
+            self.values[widget_id] = value
+        for widget_id, value in self.values.items():
+            state = client.widget_states.widgets.add()
+            state.id = widget_id
+            if isinstance(value, bool):
+                state.bool_value = value
+            else:
+                state.string_value = value
+        if trigger:
+            widget_id, fragment = self._state(trigger)
+            state = client.widget_states.widgets.add()
+            state.id = widget_id
+            state.trigger_value = True
+        if fragment:
+            client.fragment_id = fragment
+
+        start = time.perf_counter()
+        await self.ws.send(msg.SerializeToString())
+        await asyncio.wait_for(self._until_finished(navigate), self.timeout)
+        return (time.perf_counter() - start) * 1000
+
+    async def _until_finished(self, navigate):
+        start_hash = self.page_hash
+        error = None
+        while True:
+            msg = ForwardMsg()
+            msg.ParseFromString(await self.ws.recv())
+            kind = msg.WhichOneof("type")
+            if kind == "new_session":
+                if msg.new_session.page_script_hash != self.page_hash:
+                    self.page_hash = msg.new_session.page_script_hash
+                    self.widgets.clear()
+                    self.values.clear()
+            elif kind == "delta" and msg.delta.WhichOneof("type") == "new_element":
+                element = msg.delta.new_element
+                name = element.WhichOneof("type")
+                if name == "exception":
+                    error = error or f"{element.exception.type}: {element.exception.message}"
+                    continue
+                proto = getattr(element, name)
+                widget_id = getattr(proto, "id", "")
+                if widget_id and getattr(proto, "label", ""):
+                    self.widgets[proto.label] = (widget_id, proto, msg.delta.fragment_id)
+            elif kind == "page_not_found":
+                raise StepError(f"page not found: {msg.page_not_found.page_name}")
+            elif kind == "script_finished":
+                status = msg.script_finished
+                if status == COMPILE_ERROR:
+                    raise StepError("compile error")
+                # A switch_page ends the current run early; wait for the new page's run
+                done = status == FINISHED or (status == FRAGMENT_FINISHED and not navigate)
+                if done and (not navigate or self.page_hash != start_hash):
+                    if error:
+                        raise StepError(error)
+                    return
+
+
+async def think(rng, mean_s):
+    if mean_s > 0:
+        await asyncio.sleep(rng.expovariate(1 / mean_s))
+
+
+async def walk(url, rng, record, think_s=THINK_S, timeout=STEP_TIMEOUT_S):
+    """One visit from Home to the results page; ``record(step, ms, error)`` per step.
+
+    Returns whether the walk reached the results page.
+    """
+
+    async def step(name, **interaction):
+        try:
+            ms = await session.rerun(**interaction)
+        except (StepError, asyncio.TimeoutError) as e:
+            record(name, None, str(e) or type(e).__name__)
+            raise
+        record(name, ms, None)
+        await think(rng, think_s)
+
+    async with websockets.connect(stream_url(url), subprotocols=["streamlit"], max_size=None,
+                                  open_timeout=timeout) as ws:
+        session = Session(ws, timeout)
+        with contextlib.suppress(StepError, asyncio.TimeoutError):
+            await step("Home")
+            district = rng.choice(session.options(DISTRICT_PICKER))
+            await step("districts", values={DISTRICT_PICKER: district},
+                       trigger="Explore Solar Potential (Manual)", navigate=True)
+            await step("simulation", trigger="GO TO SIMULATION", navigate=True)
+            await step("choices", trigger=rng.choice(session.labels("Scenario ")), navigate=True)
+            ticks = rng.sample(LEVELS, rng.randint(1, len(LEVELS))) + [rng.choice(PERCENTAGES)]
+            for label in ticks:
+                await step("choices (tick)", values={label: True})
+            await step("runit", trigger="RUN SIMULATION", navigate=True)
+            return True
+    return False
+
+
+# --- STAGES ---
+def stream_url(url):
+    return url.rstrip("/").replace("http://", "ws://").replace("https://", "wss://") + "/_stcore/stream"
+
+
+def percentiles(values):
+    if not values:
+        return {"p50": None, "p95": None, "p99": None}
+    p50, p95, p99 = np.percentile(values, [50, 95, 99])
+    return {"p50": round(float(p50), 1), "p95": round(float(p95), 1), "p99": round(float(p99), 1)}
+
+
+async def run_stage(url, users, duration_s, think_s, timeout, seed):
+    """``users`` sessions walking for ``duration_s``; walks in flight are finished."""
+    loop = asyncio.get_running_loop()
+    records = []  # (step, ms or None, error)
+    walks = [0]
+    start = loop.time()
+    deadline = start + duration_s
+
+    def record(name, ms, error):
+        records.append((name, ms, error))
+
+    async def user(i):
+        rng = random.Random(seed * 10_000 + users * 100 + i)
+        # Spread the arrivals over the first think time
+        await asyncio.sleep(rng.uniform(0, think_s))
+        while loop.time() < deadline:
+            try:
+                # Await first: ``walks[0] += await ...`` reads the count before other users update it
+                reached = await walk(url, rng, record, think_s, timeout)
+                walks[0] += reached
+            except (OSError, websockets.WebSocketException) as e:
+                record("connection", None, f"{type(e).__name__}: {e}")
+                await asyncio.sleep(min(1.0, think_s or 1.0))
+
+    await asyncio.gather(*(user(i) for i in range(users)))
+    elapsed = loop.time() - start
+
+    latencies = [ms for _, ms, error in records if error is None]
+    errors = [f"{name}: {error}" for name, _, error in records if error is not None]
+    pages = {}
+    for name, ms, error in records:
+        if error is None:
+            pages.setdefault(name, []).append(ms)
+    return {
+        "users": users,
+        "elapsed_s": round(elapsed, 2),
+        "walks": walks[0],
+        "steps": len(latencies),
+        "steps_per_s": round(len(latencies) / elapsed, 2),
+        "walks_per_min": round(walks[0] / elapsed * 60, 1),
+        "errors": len(errors),
+        "error_rate": round(len(errors) / len(records), 4) if records else 0.0,
+        "error_samples": sorted(set(errors))[:10],
+        "latency_ms": percentiles(latencies),
+        "pages": {name: {"count": len(values), **percentiles(values)} for name, values in sorted(pages.items())},
+    }
+
+
+def breakdown(stage, first, slo_ms, factor):
+    """Why latency broke down in ``stage``, or ``None``."""
+    p95 = stage["latency_ms"]["p95"]
+    if stage["error_rate"] > MAX_ERROR_RATE:
+        return f"{stage['error_rate']:.1%} of steps failed"
+    if p95 is None:
+        return "no step completed"
+    if p95 > slo_ms:
+        return f"p95 {p95:,.0f} ms above the {slo_ms:,.0f} ms limit"
+    reference = first["latency_ms"]["p95"]
+    if reference and p95 > factor * reference:
+        return f"p95 {p95:,.0f} ms is {p95 / reference:.1f}x the single-user {reference:,.0f} ms"
+    return None
+
+
+# --- SERVER ---
+def rss_mb(pid):
+    """Resident memory of ``pid`` in MB, or ``None`` where /proc is not available."""
+    try:
+        with open(f"/proc/{pid}/status", encoding="ascii") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        return None
+    return None
+
+
+async def sample_rss(pid, samples, current_stage, start):
+    while True:
+        value = rss_mb(pid)
+        if value is not None:
+            samples.append({"t": round(time.perf_counter() - start, 2), "users": current_stage[0],
+                            "rss_mb": round(value, 1)})
+        await asyncio.sleep(RSS_INTERVAL_S)
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def wait_healthy(url, timeout=STARTUP_TIMEOUT_S):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        with contextlib.suppress(OSError):
+            with urllib.request.urlopen(url.rstrip("/") + "/_stcore/health", timeout=2) as response:
+                if response.status == 200:
+                    return
+        time.sleep(0.25)
+    raise RuntimeError(f"server at {url} not healthy after {timeout:.0f}s")
+
+
+@contextlib.contextmanager
+def local_server(port, log_path):
+    """``streamlit run Home.py`` on ``port`` with a scratch result cache; yields the process."""
+    command = [sys.executable, "-m", "streamlit", "run", "Home.py", "--server.port", str(port),
+               "--server.headless", "true", "--browser.gatherUsageStats", "false"]
+    # The cache directory outlives the process: it is removed only once the server has exited
+    with tempfile.TemporaryDirectory(prefix="solar-load-") as cache_dir, \
+            open(log_path, "w", encoding="utf-8") as log:
+        env = {**os.environ, "SOLAR_RESULT_CACHE_DIR": cache_dir}
+        process = subprocess.Popen(command, cwd=ROOT, env=env, stdout=log, stderr=subprocess.STDOUT)
+        try:
+            wait_healthy(f"http://127.0.0.1:{port}")
+            yield process
+        finally:
+            process.terminate()
+            try:
+                process.wait(10)
+            except subprocess.TimeoutExpired:
+                process.kill()
+                process.wait()
+
+
+# --- REPORT ---
+def _fmt(value):
+    return f"{value:,.0f}" if value is not None else "-"
+
+
+def _print_stage(stage):
+    latency = stage["latency_ms"]
+    rss = stage.get("rss_mb") or {}
+    print(f"{stage['users']:>6}{stage['walks']:>8}{stage['steps_per_s']:>10,.1f}{_fmt(latency['p50']):>9}"
+          f"{_fmt(latency['p95']):>9}{_fmt(latency['p99']):>9}{stage['errors']:>8}{_fmt(rss.get('max')):>9}",
+          flush=True)
+
+
+def _print_pages(stage):
+    print(f"\nper page at {stage['users']} users (ms):")
+    for name, page in stage["pages"].items():
+        print(f"  {name:<16}{page['count']:>6}{_fmt(page['p50']):>9}{_fmt(page['p95']):>9}{_fmt(page['p99']):>9}")
+
+
+async def load_test(url, pid, users, duration_s, think_s, timeout, slo_ms, factor, seed):
+    samples, current = [], [0]
+    start = time.perf_counter()
+    sampler = asyncio.create_task(sample_rss(pid, samples, current, start)) if pid else None
+
+    # One walk first, so the first stage does not pay for the server's cold caches
+    await walk(url, random.Random(seed), lambda *_: None, 0.0, timeout)
+
+    header = f"{'users':>6}{'walks':>8}{'steps/s':>10}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'errors':>8}{'RSS MB':>9}"
+    print(header)
+    print("-" * len(header))
+    stages, broken = [], None
+    try:
+        for n in users:
+            current[0] = n
+            stage_start = time.perf_counter() - start
+            stage = await run_stage(url, n, duration_s, think_s, timeout, seed)
+            rss = [s["rss_mb"] for s in samples if s["t"] >= stage_start]
+            if rss:
+                stage["rss_mb"] = {"start": rss[0], "max": max(rss), "end": rss[-1]}
+            stages.append(stage)
+            _print_stage(stage)
+            reason = breakdown(stage, stages[0], slo_ms, factor)
+            if reason:
+                broken = {"users": n, "reason": reason}
+                break
+    finally:
+        if sampler:
+            sampler.cancel()
+
+    for stage in stages[-1:]:
+        _print_pages(stage)
+    holds = stages[-2]["users"] if broken and len(stages) > 1 else (None if broken else stages[-1]["users"])
+    if broken:
+        print(f"\nlatency breaks down at {broken['users']} concurrent sessions ({broken['reason']}); "
+              f"holds at {holds if holds else 'no tested level'}")
+    else:
+        print(f"\nno breakdown up to {holds} concurrent sessions")
+    return {"stages": stages, "breakdown": broken, "max_sustained_users": holds, "rss": samples}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Load-test the dashboard with concurrent sessions.")
+    parser.add_argument("--users", nargs="+", type=int, default=USERS, help="concurrent sessions per stage")
+    parser.add_argument("--duration", type=float, default=DURATION_S, help="seconds per stage")
+    parser.add_argument("--think", type=float, default=THINK_S, help="mean think time between steps (s)")
+    parser.add_argument("--timeout", type=float, default=STEP_TIMEOUT_S, help="per-step timeout (s)")
+    parser.add_argument("--slo-ms", type=float, default=SLO_MS, help="p95 latency limit")
+    parser.add_argument("--factor", type=float, default=FACTOR, help="allowed p95 growth over the first stage")
+    parser.add_argument("--url", help="server to test (default: start one on a free port)")
+    parser.add_argument("--pid", type=int, help="server process id, for memory (with --url)")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--out", default=str(RESULTS), help="where to write the results JSON")
+    args = parser.parse_args(argv)
+
+    out = Path(args.out)
+    out.parent.mkdir(parents=True, exist_ok=True)
+    options = (args.users, args.duration, args.think, args.timeout, args.slo_ms, args.factor, args.seed)
+    if args.url:
+        result = asyncio.run(load_test(args.url, args.pid, *options))
+    else:
+        port = free_port()
+        with local_server(port, out.with_suffix(".server.log")) as process:
+            result = asyncio.run(load_test(f"http://127.0.0.1:{port}", process.pid, *options))
+
+    report = {"created": time.strftime("%Y-%m-%dT%H:%M:%S"), "python": sys.version.split()[0],
+              "streamlit": st.__version__, "cpus": os.cpu_count(), "duration_s": args.duration,
+              "think_s": args.think, "slo_ms": args.slo_ms, "factor": args.factor, **result}
+    out.write_text(json.dumps(report, indent=1))
+    print(f"results written to {out}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
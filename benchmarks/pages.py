@@ -0,0 +1,267 @@
+"""Page benchmarks on Streamlit's AppTest harness.
+
+Every page is driven with the session state a user would have when reaching
+it, and measured for:
+
+    cold_ms      first run after clearing every st.cache_* and module cache
+                 (imports are warmed up first: this is a new session on a
+                 freshly started server, not interpreter start-up)
+    warm_ms      rerun with hot caches (and the page already compiled)
+    *_peak_kb    tracemalloc peak of a cold / warm run (separate runs, so
+                 tracing does not skew the timings); Python allocations
+                 only, Arrow and GEOS buffers are not traced
+    bytes        ForwardMsg bytes a warm rerun sends to the frontend, also
+                 broken down by element type (markdown: header, plotly_chart,
+                 component_instance: folium map, ...)
+
+Timings are the fastest of several runs, the least noisy estimate on a
+shared machine; the median rerun is recorded as ``warm_median_ms``.
+Results are written as JSON and compared with a stored baseline; the run
+fails when a metric grows by more than the threshold (and by more than a
+small absolute margin, so timer noise on millisecond pages does not count).
+
+    python -m benchmarks.pages                   # compare with benchmarks/baseline.json
+    python -m benchmarks.pages --save-baseline   # accept the current numbers
+    python -m benchmarks.pages --pages runit.py --threshold 10
+
+Run from the repository root, so the pages pick up .streamlit/config.toml.
+"""
+import argparse
+import contextlib
+import json
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+import warnings
+from pathlib import Path
+
+import streamlit as st
+from streamlit.runtime.scriptrunner.script_cache import ScriptCache
+from streamlit.testing.v1 import AppTest, local_script_runner
+
+from solar import content, prefetch, resultcache
+
+ROOT = Path(__file__).resolve().parent.parent
+BENCH_DIR = Path(__file__).resolve().parent
+BASELINE = BENCH_DIR / "baseline.json"
+RESULTS = BENCH_DIR / "results" / "latest.json"
+
+SELECTION = {
+    "selected_district": "Binnenstad",
+    "scenario": "Industrial",
+    "roof_levels": ["Level 2"],
+    "roof_percentage": "100%",
+}
+PAGES = {
+    "Home.py": {},
+    "districts.py": {"selected_district": SELECTION["selected_district"]},
+    "simulation.py": {"selected_district": SELECTION["selected_district"]},
+    "choices.py": {key: SELECTION[key] for key in ("selected_district", "scenario")},
+    "runit.py": SELECTION,
+    "compare.py": SELECTION,  # every district, the selection's scenario
+}
+# A metric regresses only when it grows by the threshold AND by this margin.
+# Timings on a shared box swing by ~15 ms per rerun and ~70 ms cold; bytes are exact.
+MARGINS = {"cold_ms": 100.0, "warm_ms": 20.0, "cold_peak_kb": 512.0, "warm_peak_kb": 256.0, "bytes": 1024}
+TIMEOUT_S = 120
+# AppTest compiles the page on every run; a server compiles it once. Share
+# one bytecode cache so reruns do not pay (or allocate) for compilation.
+SCRIPT_CACHE = ScriptCache()
+local_script_runner.ScriptCache = lambda: SCRIPT_CACHE
+
+
+def page_path(page):
+    return ROOT / page if page == "Home.py" else ROOT / "pages" / page
+
+
+def clear_caches():
+    """Forget everything a fresh server process would not have computed yet."""
+    st.cache_data.clear()
+    st.cache_resource.clear()
+    SCRIPT_CACHE.clear()
+    content.CACHE.clear()
+    prefetch.clear()
+    resultcache.CACHE.clear()
+    for name, module in list(sys.modules.items()):
+        if name == "solar" or name.startswith("solar."):
+            for value in vars(module).values():
+                if callable(getattr(value, "cache_clear", None)) and getattr(value, "__module__", None) == name:
+                    value.cache_clear()
+
+
+@contextlib.contextmanager
+def scratch_result_cache():
+    """Results go to a temporary directory, emptied before every cold run, never the real cache."""
+    real = resultcache.CACHE
+    with tempfile.TemporaryDirectory(prefix="solar-bench-") as scratch:
+        resultcache.CACHE = resultcache.ResultCache(scratch, real.budget_bytes)
+        try:
+            yield resultcache.CACHE
+        finally:
+            resultcache.CACHE = real
+
+
+@contextlib.contextmanager
+def captured_messages():
+    """Collect the ForwardMsgs of every AppTest run inside the block."""
+    messages = []
+    parse = local_script_runner.parse_tree_from_messages
+
+    def record(msgs):
+        messages.extend(msgs)
+        return parse(msgs)
+
+    local_script_runner.parse_tree_from_messages = record
+    try:
+        yield messages
+    finally:
+        local_script_runner.parse_tree_from_messages = parse
+
+
+def _kind(msg):
+    kind = msg.WhichOneof("type")
+    if kind == "delta":
+        kind = msg.delta.WhichOneof("type")
+        if kind == "new_element":
+            kind = msg.delta.new_element.WhichOneof("type")
+    return kind
+
+
+def message_bytes(messages):
+    by_kind = {}
+    for msg in messages:
+        kind = _kind(msg)
+        by_kind[kind] = by_kind.get(kind, 0) + msg.ByteSize()
+    return sum(by_kind.values()), dict(sorted(by_kind.items(), key=lambda item: -item[1]))
+
+
+def _new_app(page, state):
+    at = AppTest.from_file(str(page_path(page)), default_timeout=TIMEOUT_S)
+    for key, value in state.items():
+        at.session_state[key] = value
+    return at
+
+
+def _timed_run(at):
+    start = time.perf_counter()
+    at.run()
+    elapsed = (time.perf_counter() - start) * 1000
+    if at.exception:
+        raise RuntimeError(f"{at.exception[0].value}")
+    return elapsed
+
+
+def _traced_run(at):
+    tracemalloc.start()
+    try:
+        _timed_run(at)
+        return tracemalloc.get_traced_memory()[1] / 1024
+    finally:
+        tracemalloc.stop()
+
+
+def bench_page(page, state, repeat=7, cold_repeat=3):
+    cold = []
+    for _ in range(cold_repeat):
+        clear_caches()
+        at = _new_app(page, state)
+        cold.append(_timed_run(at))
+    warm = [_timed_run(at) for _ in range(repeat)]
+
+    # tracemalloc sees every thread; Streamlit's background component
+    # manifest scan sometimes lands in the window, so keep the lower of two
+    cold_peak = []
+    for _ in range(2):
+        clear_caches()
+        cold_peak.append(_traced_run(_new_app(page, state)))
+    cold_peak_kb = min(cold_peak)
+    warm_peak_kb = min(_traced_run(at) for _ in range(2))
+
+    with captured_messages() as messages:
+        _timed_run(at)
+    total, by_kind = message_bytes(messages)
+    return {
+        "cold_ms": round(min(cold), 1),
+        "warm_ms": round(min(warm), 1),
+        "warm_median_ms": round(statistics.median(warm), 1),
+        "cold_peak_kb": round(cold_peak_kb),
+        "warm_peak_kb": round(warm_peak_kb),
+        "bytes": total,
+        "bytes_by_element": by_kind,
+    }
+
+
+def compare(results, baseline, threshold):
+    """Regression messages for every metric that grew past the threshold."""
+    failures = []
+    for page, metrics in results.items():
+        reference = baseline.get(page)
+        if reference is None:
+            continue
+        for metric, margin in MARGINS.items():
+            old, new = reference.get(metric), metrics[metric]
+            if old is None:
+                continue
+            if new > old * (1 + threshold / 100) and new - old > margin:
+                growth = f" (+{(new / old - 1) * 100:.0f}%)" if old else ""
+                failures.append(f"{page}: {metric} {old:,} -> {new:,}{growth}")
+    return failures
+
+
+def _print_table(results, baseline):
+    header = f"{'page':<14}{'cold ms':>10}{'warm ms':>10}{'cold KB':>10}{'warm KB':>10}{'bytes':>12}"
+    print(header)
+    print("-" * len(header))
+    for page, m in results.items():
+        print(f"{page:<14}{m['cold_ms']:>10,.1f}{m['warm_ms']:>10,.1f}"
+              f"{m['cold_peak_kb']:>10,}{m['warm_peak_kb']:>10,}{m['bytes']:>12,}")
+        old = baseline.get(page)
+        if old:
+            print(f"{'  baseline':<14}{old['cold_ms']:>10,.1f}{old['warm_ms']:>10,.1f}"
+                  f"{old['cold_peak_kb']:>10,}{old['warm_peak_kb']:>10,}{old['bytes']:>12,}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the dashboard pages with AppTest.")
+    parser.add_argument("--pages", nargs="+", choices=list(PAGES), default=list(PAGES))
+    parser.add_argument("--repeat", type=int, default=7, help="warm reruns per page")
+    parser.add_argument("--cold-repeat", type=int, default=3, help="cold runs per page")
+    parser.add_argument("--threshold", type=float, default=25.0, help="allowed growth in percent")
+    parser.add_argument("--baseline", default=str(BASELINE))
+    parser.add_argument("--out", default=str(RESULTS), help="where to write the results JSON")
+    parser.add_argument("--save-baseline", action="store_true", help="store the results as the new baseline")
+    args = parser.parse_args(argv)
+
+    warnings.filterwarnings("ignore")
+    with scratch_result_cache():
+        for page in args.pages:
+            _new_app(page, PAGES[page]).run()
+        results = {page: bench_page(page, PAGES[page], args.repeat, args.cold_repeat) for page in args.pages}
+
+    out = Path(args.out)
+    out.parent.mkdir(parents=True, exist_ok=True)
+    report = {"created": time.strftime("%Y-%m-%dT%H:%M:%S"), "python": sys.version.split()[0],
+              "streamlit": st.__version__, "pages": results}
+    out.write_text(json.dumps(report, indent=1))
+
+    baseline_path = Path(args.baseline)
+    if args.save_baseline:
+        baseline_path.write_text(json.dumps(report, indent=1))
+        _print_table(results, {})
+        print(f"baseline saved to {baseline_path}")
+        return 0
+
+    baseline = json.loads(baseline_path.read_text())["pages"] if baseline_path.exists() else {}
+    _print_table(results, baseline)
+    failures = compare(results, baseline, args.threshold)
+    for failure in failures:
+        print(f"REGRESSION {failure}")
+    if not baseline:
+        print(f"no baseline at {baseline_path}; run with --save-baseline to create one")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
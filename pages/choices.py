@@ -1,5 +1,7 @@
 import streamlit as st
-import base64
+from solar import prefetch
+from solar.header import render_header
+from solar.timing import debug_panel
 
 # --- PAGE CONFIG ---
 st.set_page_config(page_title="Run Simulation", layout="wide", initial_sidebar_state="collapsed")
@@ -8,100 +10,8 @@ st.set_page_config(page_title="Run Simulation", layout="wide", initial_sidebar_s
 scenario = st.session_state.get("scenario", "Unknown Scenario")
 district = st.session_state.get("selected_district", "Unknown District")
 
-# --- Load header image ---
-def get_base64_image(image_path):
-    with open(image_path, "rb") as img_file:
-        return base64.b64encode(img_file.read()).decode()
-
-img_base64 = get_base64_image("assets/solar.jpg")
-
 # --- HEADER ---
-st.markdown(f"""
-    <style>
-        .figma-header {{
-            background-color: #c8bab2;
-            display: flex;
-            justify-content: space-between;
-            align-items: center;
-            padding: 0;
-            margin-bottom: 2rem;
-        }}
-        .figma-header-left {{
-            display: flex;
-            align-items: center;
-        }}
-        .figma-solar-image {{
-            width: 210px;
-            height: 100%;
-            object-fit: cover;
-        }}
-        .figma-title-block {{
-            padding: 20px 40px;
-            text-align: center;
-            flex-grow: 1;
-        }}
-        .figma-title {{
-            font-size: 24px;
-            font-weight: bold;
-            color: black;
-            margin-bottom: 6px;
-            font-family: Georgia, serif;
-        }}
-        .figma-subtitle {{
-            font-size: 15px;
-            font-style: italic;
-            color: black;
-        }}
-        .figma-zwolle {{
-            background-color: #3a65a8;
-            color: white;
-            padding: 15px 30px;
-            font-weight: bold;
-            font-size: 20px;
-            font-family: Georgia, serif;
-        }}
-
-        /* Panel Styling */
-        # .panel {{
-        #     background-color: #ececec;
-        #     padding: 30px;
-        #     border-radius: 25px;
-        #     font-family: Georgia, serif;
-        # }}
-
-        /* Yellow buttons */
-        .yellow-btn > button {{
-            background-color: #ffdd57;
-            color: black;
-            font-weight: bold;
-            border-radius: 30px;
-            padding: 12px 24px;
-            font-size: 16px;
-            font-family: Georgia, serif;
-            border: none;
-        }}
-
-        .yellow-btn > button:hover {{
-            background-color: #f7cd45;
-            transform: scale(1.01);
-        }}
-
-        .stRadio > div, .stMultiSelect > div {{
-            background-color: transparent;
-        }}
-    </style>
-
-    <div class="figma-header">
-        <div class="figma-header-left">
-            <img class="figma-solar-image" src="data:image/jpeg;base64,{img_base64}" alt="Solar Panel">
-        </div>
-        <div class="figma-title-block">
-            <div class="figma-title">WELCOME TO THE ZWOLLE SOLAR DASHBOARD</div>
-            <div class="figma-subtitle">Track, Simulate & Optimize Solar Energy in Your District</div>
-        </div>
-        <div class="figma-zwolle">Zwolle</div>
-    </div>
-""", unsafe_allow_html=True)
+render_header()
 
 # --- LAYOUT ---
 col_left, col_right = st.columns(2)
@@ -198,6 +108,14 @@ with col_right:
 
         st.session_state["roof_levels"] = selected_levels
         st.session_state["roof_percentage"] = selected_percent
+        # Start the results page's work while it loads
+        # Guard on the values: the page's own fallbacks ("Unknown District") are truthy
+        if st.session_state.get("selected_district") and st.session_state.get("scenario") \
+                and selected_levels and selected_percent:
+            prefetch.selection(district, scenario, selected_levels, selected_percent)
 
         st.success(f"Running simulation for **{scenario}** in **{district}** with {selected_percent} roof coverage and levels: {', '.join(selected_levels)}")
         st.switch_page("pages/runit.py")
+
+# --- DEBUG TIMINGS ---
+debug_panel()
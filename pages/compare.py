@@ -0,0 +1,76 @@
+import streamlit as st
+from solar import engine, figures
+from solar.compare import METRICS, choropleth, compare, ranked
+from solar.geodata import district_names
+from solar.header import render_header
+from solar.maps import SerializedMap
+from solar.timing import debug_panel
+
+# --- PAGE CONFIG ---
+st.set_page_config(page_title="Compare Districts", layout="wide", initial_sidebar_state="collapsed")
+
+
+# One serialized map per selection; the computation behind it is a single pass
+@st.cache_resource(max_entries=32)
+def comparison_map(districts, scenario, levels, percentage, metric):
+    return SerializedMap(choropleth(compare(districts, scenario, levels, percentage), metric))
+
+
+# --- HEADER ---
+render_header()
+
+# --- Selection: picked on the Home map, or every district ---
+names = district_names()
+if "compare_pick" not in st.session_state:
+    st.session_state["compare_pick"] = st.session_state.get("compare_districts") or names
+reference_scenario, reference_levels, reference_percentage = figures.REFERENCE_CASE
+st.session_state.setdefault("compare_scenario", st.session_state.get("scenario") or reference_scenario)
+st.session_state.setdefault("compare_levels", st.session_state.get("roof_levels") or reference_levels)
+st.session_state.setdefault("compare_percentage", st.session_state.get("roof_percentage") or reference_percentage)
+
+col_back, _ = st.columns([0.3, 2])
+with col_back:
+    if st.button("⬅ GO BACK HOME"):
+        st.switch_page("Home.py")
+
+st.markdown("## Compare Districts")
+districts = st.multiselect("Districts", names, key="compare_pick")
+st.session_state["compare_districts"] = districts
+
+c1, c2, c3, c4 = st.columns([1, 1.4, 1, 1])
+with c1:
+    scenario = st.selectbox("Scenario", engine.SCENARIOS, key="compare_scenario")
+with c2:
+    levels = st.multiselect("Roof suitability", engine.LEVEL_LABELS, key="compare_levels")
+with c3:
+    percentage = st.select_slider("Adoption", engine.PERCENTAGES, key="compare_percentage")
+with c4:
+    metric = st.selectbox("Rank by", list(METRICS), format_func=lambda m: METRICS[m][0])
+
+if not districts or not levels:
+    st.info("Pick at least one district and one suitability level.")
+    debug_panel()
+    st.stop()
+
+# --- RESULTS: ranked table | choropleth ---
+frame = ranked(compare(districts, scenario, levels, percentage), metric)
+table_col, map_col = st.columns([1.2, 1])
+with table_col:
+    st.markdown(f"### {scenario} – {', '.join(levels)} Suitability ({percentage} Adoption)")
+    st.dataframe(
+        frame[["rank", "district", *METRICS]],
+        hide_index=True,
+        height=min(600, 35 * (len(frame) + 1) + 3),
+        column_config={
+            "rank": st.column_config.NumberColumn("#", width="small"),
+            "district": st.column_config.TextColumn("District"),
+            **{m: st.column_config.NumberColumn(label, format="%.1f" if m == "panel_payback_yr" else "localized")
+               for m, (label, _) in METRICS.items()},
+        },
+    )
+with map_col:
+    comparison_map(tuple(districts), scenario, tuple(levels), percentage, metric).show(
+        key="compare_map", width=560, height=600, returned_objects=())
+
+# --- DEBUG TIMINGS ---
+debug_panel()
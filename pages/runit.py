@@ -1,124 +1,102 @@
 
 import streamlit as st
-import streamlit.components.v1 as components
-import base64
+from solar import cube, export, figures, finance, hourly, montecarlo, prefetch, storage
+from solar.roofs import load_roofs
+from solar.header import render_header
+from solar.timing import debug_panel, span
 
 # --- PAGE CONFIG ---
 st.set_page_config(page_title="Zwolle Solar Simulation Dashboard", layout="wide")
 
-# --- Load header image ---
-def get_base64_image(image_path):
-    with open(image_path, "rb") as img_file:
-        return base64.b64encode(img_file.read()).decode()
+# --- HEADER ---
+render_header()
 
-img_base64 = get_base64_image("assets/solar.jpg")
+# --- Get Selection ---
+district = st.session_state.get("selected_district")
+scenario = st.session_state.get("scenario")
+levels = st.session_state.get("roof_levels") or []
+percentage = st.session_state.get("roof_percentage")
 
-# --- HEADER ---
-st.markdown(f"""
-    <style>
-        .figma-header {{
-            background-color: #c8bab2;
-            display: flex;
-            justify-content: space-between;
-            align-items: center;
-            padding: 0;
-            margin-bottom: 2rem;
-        }}
-        .figma-header-left {{
-            display: flex;
-            align-items: center;
-        }}
-        .figma-solar-image {{
-            width: 210px;
-            height: 100%;
-            object-fit: cover;
-        }}
-        .figma-title-block {{
-            padding: 20px 40px;
-            text-align: center;
-            flex-grow: 1;
-        }}
-        .figma-title {{
-            font-size: 24px;
-            font-weight: bold;
-            color: black;
-            margin-bottom: 6px;
-            font-family: Georgia, serif;
-        }}
-        .figma-subtitle {{
-            font-size: 15px;
-            font-style: italic;
-            color: black;
-        }}
-        .figma-zwolle {{
-            background-color: #3a65a8;
-            color: white;
-            padding: 15px 30px;
-            font-weight: bold;
-            font-size: 20px;
-            font-family: Georgia, serif;
-        }}
-
-        /* Panel Styling */
-        .panel {{
-            background-color: #ececec;
-            padding: 30px;
-            border-radius: 25px;
-            font-family: Georgia, serif;
-        }}
-
-        /* Yellow buttons */
-        .yellow-btn > button {{
-            background-color: #ffdd57;
-            color: black;
-            font-weight: bold;
-            border-radius: 30px;
-            padding: 12px 24px;
-            font-size: 16px;
-            font-family: Georgia, serif;
-            border: none;
-        }}
-
-        .yellow-btn > button:hover {{
-            background-color: #f7cd45;
-            transform: scale(1.01);
-        }}
-
-        .stRadio > div, .stMultiSelect > div {{
-            background-color: transparent;
-        }}
-    </style>
-
-    <div class="figma-header">
-        <div class="figma-header-left">
-            <img class="figma-solar-image" src="data:image/jpeg;base64,{img_base64}" alt="Solar Panel">
-        </div>
-        <div class="figma-title-block">
-            <div class="figma-title">WELCOME TO THE ZWOLLE SOLAR DASHBOARD</div>
-            <div class="figma-subtitle">Track, Simulate & Optimize Solar Energy in Your District</div>
-        </div>
-        <div class="figma-zwolle">Zwolle</div>
-    </div>
-""", unsafe_allow_html=True)
-
-st.markdown("## Scenario Outcome: Industry – Level 2 Suitability (100% Adoption)")
-
-# --- First Row ---
-col1, col2 = st.columns(2)
-with col1:
-    components.html(open("fig1_production.html", 'r').read(), height=360, scrolling=False)
-with col2:
-    components.html(open("fig2_storage.html", 'r').read(), height=360, scrolling=False)
-
-# --- Second Row ---
-col3, col4 = st.columns(2)
-with col3:
-    components.html(open("fig3_panels.html", 'r').read(), height=300, scrolling=False)
-with col4:
-    components.html(open("fig_payback_only.html", 'r').read(), height=360, scrolling=False)
-
-# --- Third Row ---
-components.html(open("fig_investment_only.html", 'r').read(), height=360, scrolling=False)
+res = None
+complete = bool(district and scenario and levels and percentage)
+if complete:
+    # None unless the district has its own figure; the chart then shows no current bar
+    current = figures.current_production(district)
+    # Usually already computed in the background since the district was picked
+    with span("simulation.compute"):
+        res = prefetch.get(cube.outcome, district, scenario, levels, percentage, current)
+    if load_roofs().source == "synthetic":
+        st.caption("Based on an estimated roof stock; no building footprint data loaded yet.")
+if res is None:
+    scenario, levels, percentage = figures.REFERENCE_CASE
+    res = figures.reference_results()
+    st.info("Incomplete selection, showing the reference case.")
+
+
+# --- DOWNLOAD ---
+@st.fragment
+def download_controls(scenario, levels, percentage, complete):
+    # Picking a format only reruns this fragment
+    fmt = st.selectbox("Format", list(export.FORMATS), format_func=str.upper, label_visibility="collapsed")
+    # All districts for this selection; generated on click, off the script thread. Bytes, not a
+    # stream: the download handler needs a seekable body, and one row per district is small
+    st.download_button(
+        "📥 DOWNLOAD THE RESULTS",
+        data=lambda: b"".join(export.stream(fmt, export.scenario_batches(scenario, levels, percentage))),
+        file_name=export.file_name(scenario, levels, percentage, fmt),
+        mime=export.FORMATS[fmt][0],
+        on_click="ignore",
+        disabled=not complete,
+        help=None if complete else "Complete the scenario selection to download its results.",
+    )
+
+
+# --- FINANCIAL SENSITIVITY ---
+@st.fragment
+def financial_sensitivity(panels, production_kwh, self_consumption):
+    # Changing the heatmap axes reruns only this fragment; the sweep is one array expression
+    st.caption(f"Panels only, {finance.LIFETIME_YEARS} years; {self_consumption:.0%} of the production "
+               "is used on the spot (hourly model), the rest is fed in.")
+    with span("simulation.finance"):
+        sweep = finance.grid(panels, production_kwh, self_consumption)
+        rows = finance.tornado(panels, production_kwh, self_consumption)
+        stats = finance.summary(sweep)
+    eur = lambda value: f"{'-' if value < 0 else ''}€{abs(value):,.0f}"
+    st.markdown(f"NPV over {stats['combinations']:,} parameter combinations: P10 {eur(stats['p10'])}, "
+                f"P50 {eur(stats['p50'])}, P90 {eur(stats['p90'])}; positive in {stats['share_positive']:.0%}.")
+    names = list(finance.PARAMETERS)
+    c1, c2 = st.columns(2)
+    with c1:
+        figures.plot(figures.tornado_figure, rows)
+    with c2:
+        x = st.selectbox("Across", names, index=names.index("tariff_eur_per_kwh"),
+                         format_func=lambda name: finance.PARAMETERS[name][0])
+        y = st.selectbox("Down", [name for name in names if name != x],
+                         format_func=lambda name: finance.PARAMETERS[name][0])
+        plane = {"z": finance.heatmap(sweep, x, y), "x": sweep["axes"][x], "y": sweep["axes"][y],
+                 "x_label": finance.PARAMETERS[x][0], "y_label": finance.PARAMETERS[y][0],
+                 "label": finance.METRICS["npv_eur"], "diverging": True}
+        figures.plot(figures.heatmap_figure, plane)
+
+
+st.markdown(f"## Scenario Outcome: {scenario} – {', '.join(levels)} Suitability ({percentage} Adoption)")
+
+uncertainty = st.toggle("Show uncertainty bands (Monte Carlo)", disabled=not complete)
+bands = None
+if uncertainty and complete:
+    with span("simulation.montecarlo"):
+        bands = prefetch.get(montecarlo.simulate, district, scenario, levels, percentage)
+    st.caption(f"P10–P90 over {bands['draws']:,} draws of weather year, adoption actually reached "
+               f"(up to {percentage}), panel efficiency, prices and tariff.")
+
+# --- LAYOUT SKELETON: charts fill in after the buttons are on screen ---
+row1 = st.columns(2)
+row2 = st.columns(2)
+# Below the fold: only built once the expander is opened
+investment = st.expander("Investment Cost (Panels & Storage)", on_change="rerun")
+profile = st.expander("Production Through the Year (hourly model)", on_change="rerun")
+battery = st.expander("Battery Size vs Self-Sufficiency", on_change="rerun")
+sensitivity = st.expander("Financial Sensitivity", on_change="rerun")
 
 # --- Action Buttons ---
 st.markdown("### ")
@@ -127,8 +105,49 @@ with col_btn1:
     if st.button("⬅ CHOOSE ANOTHER SCENARIO"):
         st.switch_page("pages/simulation.py")
 with col_btn2:
-    if st.button("📥 DOWNLOAD THE RESULTS"):
-        st.success("Results will download soon...")
+    download_controls(scenario, levels, percentage, complete)
 with col_btn3:
     if st.button("📊 GO BACK HOME"):
         st.switch_page("Home.py")
+
+# --- CHARTS: lightest first ---
+with row2[0]:
+    figures.plot(figures.panels_figure, res, height=300)
+with row1[0]:
+    figures.plot(figures.production_figure, res, bands=bands)
+with row1[1]:
+    figures.plot(figures.storage_figure, res)
+with row2[1]:
+    figures.plot(figures.payback_figure, res, bands=bands)
+with investment:
+    if investment.open:
+        figures.plot(figures.investment_figure, res)
+with profile:
+    if profile.open:
+        if complete:
+            with span("simulation.hourly"):
+                production = prefetch.get(hourly.run, district, scenario, levels, percentage)
+            figures.plot(figures.production_profile_figure, production)
+            if hourly.irradiance_source() == "clear-sky":
+                st.caption("No typical-year irradiance file yet: clear-sky estimate scaled to the annual yield.")
+        else:
+            st.caption("Complete the scenario selection to see its hourly production.")
+with battery:
+    if battery.open:
+        if complete:
+            with span("simulation.storage"):
+                curve = prefetch.get(prefetch.storage_sweep, district, scenario, levels, percentage)
+            figures.plot(figures.storage_curve_figure, curve, sized_kwh=res["storage_kwh"])
+            st.caption("Hourly dispatch over a typical year against an estimated demand profile.")
+        else:
+            st.caption("Complete the scenario selection to see the battery sweep.")
+with sensitivity:
+    if sensitivity.open:
+        if complete:
+            share = prefetch.get(storage.direct_self_consumption, district, scenario, levels, percentage)
+            financial_sensitivity(res["panels"], res["production_kwh"], share)
+        else:
+            st.caption("Complete the scenario selection to see its financial sensitivity.")
+
+# --- DEBUG TIMINGS ---
+debug_panel()
@@ -0,0 +1 @@
+"""Shared building blocks for the Zwolle Solar Dashboard pages."""
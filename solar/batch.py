@@ -0,0 +1,134 @@
+"""Headless batch runner: every district x selection, outside the dashboard.
+
+Each task is one (scenario, suitability levels) pair; a worker simulates all
+districts and all requested adoption percentages for it in one vectorized
+pass per percentage. Tasks are spread over a process pool, each worker loads
+the roof table once, and finished tasks are streamed into one results file
+as they arrive. A ``manifest.json`` next to it records what was run.
+
+    python -m solar.batch --out results/ [--format parquet] [--workers N]
+        [--districts NAME ...] [--scenarios NAME ...]
+        [--levels "Level 1,Level 2" ...] [--percentages 50% ...]
+
+Without selection options every combination is run: 5 scenarios x 7 level
+sets x 4 percentages.
+"""
+import argparse
+import itertools
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+from solar import engine, export
+from solar.roofs import load_roofs
+
+ROOT = Path(__file__).resolve().parent.parent
+RESULTS_DIR = ROOT / "results"
+
+
+def level_sets():
+    """Every non-empty combination of suitability levels, as label lists."""
+    return [list(combo) for n in range(1, len(engine.LEVEL_LABELS) + 1)
+            for combo in itertools.combinations(engine.LEVEL_LABELS, n)]
+
+
+def _task(args):
+    scenario, level_labels, percentages, districts = args
+    roofs = load_roofs()
+    codes = None if districts is None else [roofs.code(district) for district in districts]
+    panels = engine.roof_panels(roofs)
+    levels = engine.parse_levels(level_labels)
+    batches = []
+    for percentage in percentages:
+        result = engine.simulate(roofs, scenario, levels, engine.parse_percentage(percentage), panels)
+        batches.append(export.result_batch(roofs, result, scenario, level_labels, percentage, codes))
+    return batches
+
+
+def _progress(done, total, rows, elapsed):
+    rate = rows / elapsed if elapsed else 0.0
+    print(f"\r[{done:>{len(str(total))}}/{total}] {done / total:4.0%}  {rows:,} rows  "
+          f"{rate:,.0f} rows/s", end="", file=sys.stderr, flush=True)
+
+
+def run(out_dir=RESULTS_DIR, fmt="parquet", districts=None, scenarios=None, levels=None,
+        percentages=None, workers=None):
+    """Run every combination and write ``results.<fmt>`` plus ``manifest.json``."""
+    scenarios = scenarios or engine.SCENARIOS
+    levels = levels or level_sets()
+    percentages = percentages or engine.PERCENTAGES
+    tasks = [(scenario, level_labels, percentages, districts)
+             for scenario in scenarios for level_labels in levels]
+
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    path = out_dir / f"results.{export.FORMATS[fmt][1]}"
+    tmp = out_dir / f".results.{os.getpid()}.{export.FORMATS[fmt][1]}"
+    stats = {"tasks": 0, "rows": 0}
+    start = time.perf_counter()
+
+    def batches(pool):
+        for task_batches in pool.map(_task, tasks):
+            for batch in task_batches:
+                stats["rows"] += len(batch["district"])
+                yield batch
+            stats["tasks"] += 1
+            _progress(stats["tasks"], len(tasks), stats["rows"], time.perf_counter() - start)
+
+    with ProcessPoolExecutor(max_workers=workers) as pool, open(tmp, "wb") as f:
+        size = export.write(fmt, batches(pool), f)
+    os.replace(tmp, path)
+    elapsed = time.perf_counter() - start
+    print(file=sys.stderr)
+
+    manifest = {
+        "results": path.name,
+        "format": fmt,
+        "rows": stats["rows"],
+        "bytes": size,
+        "districts": districts or load_roofs().districts,
+        "scenarios": scenarios,
+        "levels": levels,
+        "percentages": percentages,
+        "model_version": engine.MODEL_VERSION,
+        "data_version": load_roofs().version,
+        "roof_source": load_roofs().source,
+        "seconds": round(elapsed, 3),
+    }
+    with open(out_dir / "manifest.json", "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=1, ensure_ascii=False)
+    print(f"{stats['rows']:,} rows ({len(tasks)} tasks) in {elapsed:.2f}s, "
+          f"{stats['rows'] / elapsed:,.0f} rows/s -> {path} ({size:,} bytes)", file=sys.stderr)
+    return manifest
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Simulate every district and selection.")
+    parser.add_argument("--out", default=str(RESULTS_DIR), help="results directory")
+    parser.add_argument("--format", choices=list(export.FORMATS), default="parquet")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: CPU count)")
+    parser.add_argument("--districts", nargs="+", help="district names (default: all)")
+    parser.add_argument("--scenarios", nargs="+", choices=engine.SCENARIOS)
+    parser.add_argument("--levels", nargs="+", metavar="LEVELS",
+                        help='comma-separated level sets, e.g. "Level 1,Level 2" (default: all 7)')
+    parser.add_argument("--percentages", nargs="+", choices=engine.PERCENTAGES)
+    args = parser.parse_args(argv)
+
+    if args.districts:
+        unknown = set(args.districts) - set(load_roofs().districts)
+        if unknown:
+            parser.error(f"unknown districts: {', '.join(sorted(unknown))}")
+    levels = None
+    if args.levels:
+        levels = [[label.strip() for label in spec.split(",")] for spec in args.levels]
+        bad = {label for level_labels in levels for label in level_labels} - set(engine.LEVEL_LABELS)
+        if bad:
+            parser.error(f"unknown levels: {', '.join(sorted(bad))}")
+    run(args.out, args.format, args.districts, args.scenarios, levels, args.percentages, args.workers)
+
+
+if __name__ == "__main__":
+    main()
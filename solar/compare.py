@@ -0,0 +1,70 @@
+"""Side-by-side comparison of many districts under one selection.
+
+Every district is evaluated in one vectorized pass: a slice of the scenario
+cube when it is current, otherwise one ``engine.simulate`` over all roofs.
+Comparing all districts therefore costs about as much as showing one.
+
+    frame = compare(["Binnenstad", "Assendorp"], "All", ["Level 1"], "100%")
+"""
+import branca.colormap
+import folium
+import numpy as np
+import pandas as pd
+
+from solar import engine, lod
+from solar.cube import open_cube
+from solar.timing import span
+
+# Column -> (label, rank best first when largest)
+METRICS = {
+    "production_kwh": ("Production (kWh/yr)", True),
+    "panels": ("Panels", True),
+    "storage_kwh": ("Storage (kWh)", True),
+    "investment_eur": ("Investment (€)", False),
+    "panel_payback_yr": ("Panel payback (yr)", False),
+}
+COMPARE_ZOOM = 12
+
+
+def compare(districts, scenario, level_labels, percentage):
+    """Per-district results as a DataFrame, one row per district in the given order."""
+    with span("compare.compute"):
+        cube = open_cube()
+        if cube is not None:
+            result = cube.lookup_many(districts, scenario, level_labels, percentage)
+        else:
+            result = engine.run_many(districts, scenario, level_labels, percentage)
+    frame = pd.DataFrame({"district": list(districts), **result})
+    frame["panels"] = frame["panels"].astype(np.int64)
+    frame["investment_eur"] = frame["panel_cost_eur"] + frame["storage_cost_eur"]
+    return frame
+
+
+def ranked(frame, metric):
+    """``frame`` sorted best first on ``metric``, with a 1-based ``rank`` column."""
+    largest_first = METRICS[metric][1]
+    out = frame.sort_values(metric, ascending=not largest_first, na_position="last", kind="stable")
+    out = out.reset_index(drop=True)
+    out.insert(0, "rank", np.arange(1, len(out) + 1))
+    return out
+
+
+def choropleth(frame, metric, location=(52.516, 6.1)):
+    """City map with the compared districts shaded by ``metric``; the others stay grey."""
+    values = dict(zip(frame["district"], frame[metric]))
+    finite = [value for value in values.values() if np.isfinite(value)]
+    low, high = (min(finite), max(finite)) if finite else (0.0, 1.0)
+    colormap = branca.colormap.linear.YlOrRd_09.scale(low, max(high, low + 1e-9))
+    colormap.caption = METRICS[metric][0]
+
+    def style(feature):
+        value = values.get(feature["properties"]["name"])
+        if value is None or not np.isfinite(value):
+            return {"fillColor": "#d9d9d9", "color": "#777777", "weight": 1, "fillOpacity": 0.3}
+        return {"fillColor": colormap(value), "color": "#555555", "weight": 1, "fillOpacity": 0.75}
+
+    with span("map.build"):
+        fmap = folium.Map(location=list(location), zoom_start=COMPARE_ZOOM)
+        fmap.add_child(lod.districts_layer(COMPARE_ZOOM, style_function=style))
+        colormap.add_to(fmap)
+    return fmap
@@ -0,0 +1,112 @@
+"""Process-wide cache for file-backed content.
+
+The chart store, the district topologies and the header fallback are read
+from disk and shared by every session. ``ContentCache`` keeps one copy of
+each per process under an overall byte budget:
+
+* entries are keyed on (path, loader), so the raw bytes and a parsed form
+  of the same file are separate entries;
+* every access stats the file, and an entry whose mtime or size changed is
+  reloaded, so rebuilt artifacts are picked up without a restart;
+* least recently used entries are evicted once the budget is exceeded;
+  an entry larger than the whole budget is returned but not kept.
+
+Values are shared between sessions: treat them as read-only. The budget is
+``SOLAR_CONTENT_CACHE_MB`` (default 64).
+"""
+import json
+import os
+import threading
+from collections import OrderedDict
+from pathlib import Path
+
+DEFAULT_BUDGET_MB = 64
+
+
+def read_bytes(path):
+    with open(path, "rb") as f:
+        return f.read()
+
+
+def read_text(path):
+    with open(path, encoding="utf-8") as f:
+        return f.read()
+
+
+def read_json(path):
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+class ContentCache:
+    def __init__(self, budget_bytes):
+        self.budget_bytes = budget_bytes
+        self._entries = OrderedDict()  # (path, loader) -> (mtime_ns, size, nbytes, value)
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._counters = {"hits": 0, "misses": 0, "invalidations": 0, "evictions": 0, "bytes_loaded": 0}
+
+    def get(self, path, loader=read_bytes, nbytes=None):
+        """``loader(path)``, cached until the file changes.
+
+        ``nbytes`` sizes the value for the budget; by default ``len()`` of
+        ``str``/``bytes`` values and the file size for anything else.
+        """
+        path = str(Path(path).resolve())
+        stat = os.stat(path)
+        key = (path, loader)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if entry[:2] == (stat.st_mtime_ns, stat.st_size):
+                    self._entries.move_to_end(key)
+                    self._counters["hits"] += 1
+                    return entry[3]
+                self._drop(key)
+                self._counters["invalidations"] += 1
+            self._counters["misses"] += 1
+
+        # Load outside the lock; concurrent misses on one file may both load
+        value = loader(path)
+        if nbytes is None:
+            nbytes = len(value) if isinstance(value, (str, bytes)) else stat.st_size
+        with self._lock:
+            self._counters["bytes_loaded"] += stat.st_size
+            if nbytes <= self.budget_bytes:
+                if key in self._entries:
+                    self._drop(key)
+                self._entries[key] = (stat.st_mtime_ns, stat.st_size, nbytes, value)
+                self._bytes += nbytes
+                while self._bytes > self.budget_bytes:
+                    self._drop(next(iter(self._entries)))
+                    self._counters["evictions"] += 1
+        return value
+
+    def _drop(self, key):
+        self._bytes -= self._entries.pop(key)[2]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self):
+        with self._lock:
+            return {
+                **self._counters,
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "budget_bytes": self.budget_bytes,
+            }
+
+
+CACHE = ContentCache(int(float(os.environ.get("SOLAR_CONTENT_CACHE_MB", DEFAULT_BUDGET_MB)) * 1024 * 1024))
+
+
+def load(path, loader=read_bytes, nbytes=None):
+    """``loader(path)`` through the process-wide cache."""
+    return CACHE.get(path, loader, nbytes)
+
+
+def load_json(path):
+    return CACHE.get(path, read_json)
@@ -0,0 +1,147 @@
+"""Precomputed scenario cube.
+
+The selection space is small and fixed: district x scenario x suitability
+level x adoption percentage. Panels and production are additive over roofs,
+so the cube stores them per single level and a multi-level selection is the
+sum of at most three cells; everything else follows from ``engine.derive``.
+
+On disk the cube is one ``.npy`` file per metric plus ``meta.json`` in
+``data/cube/``. The arrays are opened with ``mmap_mode="r"``, so every server
+worker shares the same pages through the OS file cache instead of loading a
+private copy.
+
+Rebuild (in parallel, one task per district) after changing the roof data or
+the model parameters:
+
+    python -m solar.cube [--workers N]
+"""
+import argparse
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from pathlib import Path
+
+import numpy as np
+
+from solar import engine
+from solar.roofs import LEVELS, data_version, load_roofs
+
+ROOT = Path(__file__).resolve().parent.parent
+CUBE_DIR = ROOT / "data" / "cube"
+METRICS = ["panels", "production_kwh"]
+
+
+# --- BUILD ---
+def _district_block(code):
+    """(scenario, level, percentage) block of every metric for one district."""
+    roofs = load_roofs()
+    sub = roofs.subset(roofs.districts[code])
+    panels = engine.roof_panels(sub)
+    shape = (len(engine.SCENARIOS), len(LEVELS), len(engine.PERCENTAGES))
+    block = {metric: np.zeros(shape) for metric in METRICS}
+    for s, scenario in enumerate(engine.SCENARIOS):
+        for l, level in enumerate(LEVELS):
+            for p, percentage in enumerate(engine.PERCENTAGES):
+                result = engine.simulate(sub, scenario, [level], engine.parse_percentage(percentage), panels)
+                for metric in METRICS:
+                    block[metric][s, l, p] = result[metric][0]
+    return code, block
+
+
+def build(out_dir=CUBE_DIR, workers=None):
+    roofs = load_roofs()
+    n = len(roofs.districts)
+    shape = (n, len(engine.SCENARIOS), len(LEVELS), len(engine.PERCENTAGES))
+    cube = {metric: np.zeros(shape) for metric in METRICS}
+
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for code, block in pool.map(_district_block, range(n)):
+            for metric in METRICS:
+                cube[metric][code] = block[metric]
+
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    for metric in METRICS:
+        # Write next to the target and rename, so running servers never map a half-written file
+        tmp = out_dir / f".{metric}.{os.getpid()}.npy"
+        np.save(tmp, cube[metric])
+        os.replace(tmp, out_dir / f"{metric}.npy")
+    meta = {
+        "districts": roofs.districts,
+        "scenarios": engine.SCENARIOS,
+        "levels": LEVELS,
+        "percentages": engine.PERCENTAGES,
+        "metrics": METRICS,
+        "model_version": engine.MODEL_VERSION,
+        "data_version": roofs.version,
+    }
+    with open(out_dir / "meta.json", "w", encoding="utf-8") as f:
+        json.dump(meta, f, indent=1, ensure_ascii=False)
+    print(f"{n} districts x {np.prod(shape[1:])} selections in {time.perf_counter() - start:.2f}s -> {out_dir}")
+
+
+# --- LOOKUP ---
+class Cube:
+    def __init__(self, path=CUBE_DIR):
+        path = Path(path)
+        with open(path / "meta.json", encoding="utf-8") as f:
+            self.meta = json.load(f)
+        self.arrays = {metric: np.load(path / f"{metric}.npy", mmap_mode="r") for metric in self.meta["metrics"]}
+        self._district = {name: i for i, name in enumerate(self.meta["districts"])}
+        self._scenario = {name: i for i, name in enumerate(self.meta["scenarios"])}
+        self._percentage = {label: i for i, label in enumerate(self.meta["percentages"])}
+
+    def is_current(self):
+        # Against the file, not load_roofs(): pages that only read the cube never build the roof table
+        return (self.meta["model_version"] == engine.MODEL_VERSION
+                and self.meta["data_version"] == data_version())
+
+    def lookup(self, district, scenario, level_labels, percentage, current_production_kwh=0.0):
+        """Scenario outcome in the figure-store result shape, from at most three cells."""
+        d, s, p = self._district[district], self._scenario[scenario], self._percentage[percentage]
+        levels = [self.meta["levels"].index(level) for level in engine.parse_levels(level_labels)]
+        totals = {metric: float(self.arrays[metric][d, s, levels, p].sum()) for metric in METRICS}
+        out = {key: float(value) for key, value in engine.derive(totals["panels"], totals["production_kwh"]).items()}
+        out["panels"] = int(out["panels"])
+        out["current_production_kwh"] = current_production_kwh
+        return out
+
+    def lookup_many(self, districts, scenario, level_labels, percentage):
+        """Results for many districts at once: a dict of arrays aligned with ``districts``."""
+        d = np.array([self._district[district] for district in districts], dtype=np.int64)
+        s, p = self._scenario[scenario], self._percentage[percentage]
+        levels = [self.meta["levels"].index(level) for level in engine.parse_levels(level_labels)]
+        totals = {metric: self.arrays[metric][:, s, :, p][np.ix_(d, levels)].sum(axis=1) for metric in METRICS}
+        return engine.derive(totals["panels"], totals["production_kwh"])
+
+
+@lru_cache(maxsize=None)
+def open_cube(path=CUBE_DIR):
+    """Process-wide cube, or ``None`` when it is missing or out of date."""
+    if not (Path(path) / "meta.json").exists():
+        return None
+    cube = Cube(path)
+    return cube if cube.is_current() else None
+
+
+def outcome(district, scenario, level_labels, percentage, current_production_kwh=0.0):
+    """Scenario outcome for one district: a cube slice when current, else the engine."""
+    cube = open_cube()
+    if cube is not None:
+        return cube.lookup(district, scenario, level_labels, percentage, current_production_kwh)
+    return engine.run(district, scenario, level_labels, percentage, current_production_kwh)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Precompute the scenario cube.")
+    parser.add_argument("--out", default=str(CUBE_DIR), help="output directory")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: CPU count)")
+    args = parser.parse_args(argv)
+    build(args.out, args.workers)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+"""Vectorized solar simulation engine.
+
+A selection is (district, land-use scenario, suitability levels, adoption %).
+Every roof is evaluated at once with NumPy masks and the totals per district
+are gathered with ``np.bincount``; there are no per-roof Python loops.
+
+Adoption is deterministic: each roof has a fixed rank in [0, 1) and is
+adopted when ``rank < adoption``, so 25% adoption is always a subset of 50%.
+"""
+import numpy as np
+
+from solar.roofs import LEVELS, USAGES, load_roofs
+
+SCENARIOS = ["Industrial", "Residential", "Other", "All", "Large Roofs"]
+LEVEL_LABELS = [f"Level {level}" for level in LEVELS]
+PERCENTAGES = ["25%", "50%", "75%", "100%"]
+
+# --- MODEL PARAMETERS ---
+# Bump whenever a parameter or formula below changes; precomputed results are keyed on it
+MODEL_VERSION = 1
+PANEL_AREA_M2 = 1.7
+PANEL_KWP = 0.3
+SPECIFIC_YIELD_KWH_PER_KWP = 906.0
+# Share of the roof area that can carry panels, per suitability level
+USABLE_SHARE = {1: 0.7, 2: 0.5, 3: 0.3}
+LARGE_ROOF_M2 = 1000.0
+
+PANEL_COST_EUR = 600.0
+STORAGE_COST_EUR_PER_KWH = 710.0
+# Battery sized to hold this many days of average production
+STORAGE_DAYS = 1.77
+ELECTRICITY_PRICE_EUR_PER_KWH = 0.19
+FEED_IN_PRICE_EUR_PER_KWH = 0.15
+STORAGE_CYCLES_PER_YEAR = 365
+
+
+def parse_levels(labels):
+    return [int(label.split()[-1]) for label in labels]
+
+
+def parse_percentage(label):
+    return float(label.rstrip("%")) / 100
+
+
+def roof_panels(roofs):
+    """Panels that fit on every roof of the table."""
+    usable = np.array([USABLE_SHARE[level] for level in LEVELS])
+    return np.floor(roofs.area * usable[roofs.level - 1] / PANEL_AREA_M2)
+
+
+def scenario_mask(roofs, scenario):
+    if scenario == "All":
+        return np.ones(len(roofs), dtype=bool)
+    if scenario == "Large Roofs":
+        return roofs.area >= LARGE_ROOF_M2
+    return roofs.usage == USAGES.index(scenario)
+
+
+def selection_mask(roofs, scenario, levels, adoption):
+    return (
+        scenario_mask(roofs, scenario)
+        & np.isin(roofs.level, levels)
+        & (roofs.rank < adoption)
+    )
+
+
+def derive(panels, production_kwh):
+    """Storage and financials from panel counts and annual production (arrays)."""
+    panels = np.asarray(panels, dtype=float)
+    production_kwh = np.asarray(production_kwh, dtype=float)
+    storage_kwh = production_kwh / 365 * STORAGE_DAYS
+    panel_cost = panels * PANEL_COST_EUR
+    storage_cost = storage_kwh * STORAGE_COST_EUR_PER_KWH
+    panel_savings = production_kwh * ELECTRICITY_PRICE_EUR_PER_KWH
+    storage_savings = (storage_kwh * STORAGE_CYCLES_PER_YEAR
+                       * (ELECTRICITY_PRICE_EUR_PER_KWH - FEED_IN_PRICE_EUR_PER_KWH))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        panel_payback = np.where(panel_savings > 0, panel_cost / panel_savings, np.nan)
+        storage_payback = np.where(storage_savings > 0, storage_cost / storage_savings, np.nan)
+    return {
+        "panels": panels,
+        "production_kwh": production_kwh,
+        "storage_kwh": storage_kwh,
+        "panel_cost_eur": panel_cost,
+        "storage_cost_eur": storage_cost,
+        "panel_payback_yr": panel_payback,
+        "storage_payback_yr": storage_payback,
+    }
+
+
+def simulate(roofs, scenario, levels, adoption, panels=None):
+    """Results for every district of ``roofs`` in one pass.
+
+    ``levels`` are suitability levels (ints), ``adoption`` a share in [0, 1].
+    Returns a dict of arrays indexed by district code.
+    """
+    if panels is None:
+        panels = roof_panels(roofs)
+    selected = np.where(selection_mask(roofs, scenario, levels, adoption), panels, 0.0)
+    n = len(roofs.districts)
+    district_panels = np.bincount(roofs.district, weights=selected, minlength=n)
+    production = district_panels * PANEL_KWP * SPECIFIC_YIELD_KWH_PER_KWP
+    return derive(district_panels, production)
+
+
+def run_many(districts, scenario, level_labels, percentage):
+    """Results for many districts from one pass over all roofs, aligned with ``districts``."""
+    roofs = load_roofs()
+    codes = [roofs.code(district) for district in districts]
+    result = simulate(roofs, scenario, parse_levels(level_labels), parse_percentage(percentage))
+    return {key: values[codes] for key, values in result.items()}
+
+
+def run(district, scenario, level_labels, percentage, current_production_kwh=0.0):
+    """Scenario outcome for one district in the figure-store result shape."""
+    roofs = load_roofs()
+    i = roofs.code(district)
+    result = simulate(roofs, scenario, parse_levels(level_labels), parse_percentage(percentage))
+    out = {key: float(values[i]) for key, values in result.items()}
+    out["panels"] = int(out["panels"])
+    out["current_production_kwh"] = current_production_kwh
+    return out
@@ -0,0 +1,284 @@
+"""Streaming results export (CSV, Parquet, XLSX).
+
+An export is a sequence of column batches (dicts of equal-length arrays with
+the same keys). Each writer turns the batches into a stream of ``bytes``
+chunks, so an export of any size is produced piece by piece: no DataFrame of
+the whole result, no temporary file. Memory use is bounded by one batch plus
+the writer's own buffer (a Parquet row group, a deflate window).
+
+    for chunk in stream("parquet", scenario_batches("All", ["Level 1"], "100%")):
+        out.write(chunk)
+
+From the command line, for all districts at once (``--hourly`` for every
+hour of the year instead of the annual results):
+
+    python -m solar.export --scenario All --levels "Level 1" "Level 2" \\
+        --percentage 100% --format xlsx --out results.xlsx
+"""
+import argparse
+import csv
+import io
+import math
+import sys
+import zipfile
+from xml.sax.saxutils import escape
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from solar import engine, hourly
+from solar.roofs import load_roofs
+
+FORMATS = {
+    "csv": ("text/csv", "csv"),
+    "parquet": ("application/vnd.apache.parquet", "parquet"),
+    "xlsx": ("application/vnd.openxmlformats-officedocument.spreadsheetml.sheet", "xlsx"),
+}
+# Rows per CSV/XLSX write; large batches are written in slices of this size
+CHUNK_ROWS = 10_000
+# Districts per hourly batch (8760 rows each)
+CHUNK_DISTRICTS = 4
+RESULT_COLUMNS = [
+    "district", "scenario", "levels", "adoption",
+    "production_kwh", "storage_kwh", "panels",
+    "panel_cost_eur", "storage_cost_eur", "investment_eur",
+    "panel_payback_yr", "storage_payback_yr",
+]
+
+
+# --- BATCHES ---
+def result_batch(roofs, result, scenario, level_labels, percentage, codes=None):
+    """One batch of per-district rows from an ``engine.simulate`` result."""
+    codes = np.arange(len(roofs.districts)) if codes is None else np.asarray(codes, dtype=np.int64)
+    n = len(codes)
+    batch = {
+        "district": np.asarray(roofs.districts, dtype=object)[codes],
+        "scenario": np.full(n, scenario, dtype=object),
+        "levels": np.full(n, ", ".join(level_labels), dtype=object),
+        "adoption": np.full(n, percentage, dtype=object),
+    }
+    batch.update({key: values[codes] for key, values in result.items()})
+    batch["panels"] = batch["panels"].astype(np.int64)
+    batch["investment_eur"] = batch["panel_cost_eur"] + batch["storage_cost_eur"]
+    return {column: batch[column] for column in RESULT_COLUMNS}
+
+
+def scenario_batches(scenario, level_labels, percentage, districts=None):
+    """Per-district results of one selection, as a single batch.
+
+    All districts are simulated in one vectorized pass; ``districts``
+    optionally restricts (and orders) the rows.
+    """
+    roofs = load_roofs()
+    result = engine.simulate(roofs, scenario, engine.parse_levels(level_labels),
+                             engine.parse_percentage(percentage))
+    codes = None if districts is None else [roofs.code(district) for district in districts]
+    yield result_batch(roofs, result, scenario, level_labels, percentage, codes)
+
+
+def hourly_batches(scenario, level_labels, percentage, districts=None, chunk_districts=CHUNK_DISTRICTS):
+    """Hourly production of one selection, one batch per ``chunk_districts`` districts.
+
+    Rows are district-major; ``hour`` counts from 0 at 1 January 00:00.
+    """
+    roofs = load_roofs()
+    production = hourly.hourly_production(roofs, scenario, engine.parse_levels(level_labels),
+                                          engine.parse_percentage(percentage))
+    names = np.asarray(roofs.districts, dtype=object)
+    codes = np.arange(len(names)) if districts is None else np.array([roofs.code(d) for d in districts])
+    hours = np.arange(hourly.HOURS, dtype=np.int64)
+    for start in range(0, len(codes), chunk_districts):
+        chunk = codes[start:start + chunk_districts]
+        yield {
+            "district": np.repeat(names[chunk], hourly.HOURS),
+            "hour": np.tile(hours, len(chunk)),
+            "production_kwh": production[:, chunk].T.ravel(),
+        }
+
+
+def _row_slices(batches):
+    for batch in batches:
+        n = len(next(iter(batch.values())))
+        for start in range(0, n, CHUNK_ROWS):
+            yield {column: values[start:start + CHUNK_ROWS] for column, values in batch.items()}
+
+
+# --- WRITERS ---
+class _Sink:
+    """Write-only file object whose contents are drained as chunks.
+
+    No ``seek``: zipfile then writes data descriptors instead of seeking back
+    to patch headers, which is what makes a streamed XLSX possible.
+    """
+
+    def __init__(self):
+        self._parts = []
+        self._position = 0
+        self.closed = False
+
+    def write(self, data):
+        self._parts.append(bytes(data))
+        self._position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self._position
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+    def drain(self):
+        data = b"".join(self._parts)
+        self._parts.clear()
+        return data
+
+
+def iter_csv(batches):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator="\n")
+    header = True
+    for chunk in _row_slices(batches):
+        if header:
+            writer.writerow(chunk.keys())
+            header = False
+        writer.writerows(zip(*(values.tolist() for values in chunk.values())))
+        yield buffer.getvalue().encode("utf-8")
+        buffer.seek(0)
+        buffer.truncate()
+
+
+def iter_parquet(batches):
+    sink = _Sink()
+    writer = None
+    for batch in batches:
+        table = pa.Table.from_pydict(batch)
+        if writer is None:
+            writer = pq.ParquetWriter(sink, table.schema, compression="zstd")
+        # One row group per batch
+        writer.write_table(table)
+        yield sink.drain()
+    if writer is not None:
+        writer.close()
+        yield sink.drain()
+
+
+_XLSX_CONTENT_TYPES = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+    '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+    '<Default Extension="xml" ContentType="application/xml"/>'
+    '<Override PartName="/xl/workbook.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+    '<Override PartName="/xl/worksheets/sheet1.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+    '</Types>'
+)
+_XLSX_RELS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" Target="xl/workbook.xml" '
+    'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument"/>'
+    '</Relationships>'
+)
+_XLSX_WORKBOOK = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+    'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+    '<sheets><sheet name="%s" sheetId="1" r:id="rId1"/></sheets></workbook>'
+)
+_XLSX_WORKBOOK_RELS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" Target="worksheets/sheet1.xml" '
+    'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet"/>'
+    '</Relationships>'
+)
+_XLSX_SHEET_START = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main"><sheetData>'
+)
+_XLSX_SHEET_END = '</sheetData></worksheet>'
+
+
+def _xlsx_cell(value):
+    if isinstance(value, str):
+        return f'<c t="inlineStr"><is><t>{escape(value)}</t></is></c>'
+    if value is None or (isinstance(value, float) and not math.isfinite(value)):
+        return "<c/>"
+    return f"<c><v>{value!r}</v></c>"
+
+
+def iter_xlsx(batches, sheet_name="Results"):
+    """Single-sheet workbook; strings are inline, so no shared-strings table is kept."""
+    sink = _Sink()
+    with zipfile.ZipFile(sink, "w", compression=zipfile.ZIP_DEFLATED) as archive:
+        archive.writestr("[Content_Types].xml", _XLSX_CONTENT_TYPES)
+        archive.writestr("_rels/.rels", _XLSX_RELS)
+        archive.writestr("xl/workbook.xml", _XLSX_WORKBOOK % escape(sheet_name))
+        archive.writestr("xl/_rels/workbook.xml.rels", _XLSX_WORKBOOK_RELS)
+        with archive.open("xl/worksheets/sheet1.xml", "w", force_zip64=True) as sheet:
+            sheet.write(_XLSX_SHEET_START.encode())
+            header = True
+            for chunk in _row_slices(batches):
+                rows = []
+                if header:
+                    rows.append("<row>" + "".join(_xlsx_cell(column) for column in chunk) + "</row>")
+                    header = False
+                for row in zip(*(values.tolist() for values in chunk.values())):
+                    rows.append("<row>" + "".join(_xlsx_cell(value) for value in row) + "</row>")
+                sheet.write("".join(rows).encode("utf-8"))
+                yield sink.drain()
+            sheet.write(_XLSX_SHEET_END.encode())
+    yield sink.drain()
+
+
+_WRITERS = {"csv": iter_csv, "parquet": iter_parquet, "xlsx": iter_xlsx}
+
+
+def stream(fmt, batches):
+    """``bytes`` chunks of the export; empty chunks are skipped."""
+    return (chunk for chunk in _WRITERS[fmt](batches) if chunk)
+
+
+def write(fmt, batches, out):
+    """Stream the export into a binary file object; returns the bytes written."""
+    size = 0
+    for chunk in stream(fmt, batches):
+        out.write(chunk)
+        size += len(chunk)
+    return size
+
+
+def file_name(scenario, level_labels, percentage, fmt):
+    levels = "-".join(str(level) for level in engine.parse_levels(level_labels))
+    slug = scenario.lower().replace(" ", "-")
+    return f"zwolle-solar_{slug}_levels-{levels}_{percentage.rstrip('%')}pct.{FORMATS[fmt][1]}"
+
+
+# --- CLI ---
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Export scenario results for every district.")
+    parser.add_argument("--scenario", choices=engine.SCENARIOS, required=True)
+    parser.add_argument("--levels", nargs="+", choices=engine.LEVEL_LABELS, required=True)
+    parser.add_argument("--percentage", choices=engine.PERCENTAGES, required=True)
+    parser.add_argument("--format", choices=list(FORMATS), default="csv")
+    parser.add_argument("--hourly", action="store_true", help="hourly production instead of annual results")
+    parser.add_argument("--out", default="-", help="output file, '-' for stdout")
+    args = parser.parse_args(argv)
+
+    make_batches = hourly_batches if args.hourly else scenario_batches
+    batches = make_batches(args.scenario, args.levels, args.percentage)
+    if args.out == "-":
+        write(args.format, batches, sys.stdout.buffer)
+        return
+    with open(args.out, "wb") as out:
+        size = write(args.format, batches, out)
+    print(f"{args.out}: {size:,} bytes", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
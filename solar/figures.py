@@ -0,0 +1,295 @@
+"""Figure store: compact chart series keyed by district and scenario.
+
+Instead of one pre-rendered HTML file per chart, the store keeps only the
+numbers behind every chart in ``assets/figure_store.json``::
+
+    {"version": 1,
+     "districts": {
+         "<district>": {
+             "overview": {...},
+             "results": {"<scenario>|<levels>|<percentage>": {...}}}}}
+
+The ``"*"`` district holds the reference case that was rendered offline
+(Industry - Level 2 Suitability, 100% adoption). A district without an entry
+of its own is shown the reference case, and pages label it as such
+(``is_reference``); a name that is not a district raises ``KeyError``.
+Charts are built on demand with the ``*_figure`` helpers and drawn by
+``st.plotly_chart``.
+
+Re-seed the reference case from the archived chart payloads with:
+
+    python -m solar.figures
+"""
+import json
+from pathlib import Path
+
+import numpy as np
+import plotly.graph_objects as go
+import streamlit as st
+
+from solar import content
+from solar.timing import span
+
+ROOT = Path(__file__).resolve().parent.parent
+STORE_PATH = ROOT / "assets" / "figure_store.json"
+PAYLOAD_DIR = ROOT / "assets" / "charts"
+
+DEFAULT_DISTRICT = "*"
+REFERENCE_CASE = ("Industrial", ["Level 2"], "100%")
+CHART_HEIGHT = 350
+
+
+def scenario_key(scenario, levels, percentage):
+    return f"{scenario}|{'+'.join(sorted(levels))}|{percentage}"
+
+
+# --- STORE ACCESS ---
+def load_store(path=STORE_PATH):
+    """The whole store, shared by every session (do not modify)."""
+    return content.load_json(path)
+
+
+def is_reference(district):
+    """Whether ``district`` has no entry of its own and is shown the reference case."""
+    from solar.geodata import district_names
+
+    if district in load_store()["districts"]:
+        return False
+    if district not in district_names():
+        raise KeyError(f"unknown district: {district!r}")
+    return True
+
+
+def _district_entry(district):
+    districts = load_store()["districts"]
+    return districts[DEFAULT_DISTRICT] if is_reference(district) else districts[district]
+
+
+def overview(district):
+    """Current-situation series for ``district`` (the reference case's when it has none)."""
+    return _district_entry(district)["overview"]
+
+
+def current_production(district):
+    """The district's own current production (kWh), or ``None`` when only the reference case has one."""
+    return None if is_reference(district) else overview(district)["electricity_generated_kwh"]
+
+
+def results(district, scenario, levels, percentage):
+    """Stored scenario outcome, or ``None`` when this selection has no entry."""
+    key = scenario_key(scenario, levels, percentage)
+    return _district_entry(district)["results"].get(key)
+
+
+def reference_results():
+    return results(DEFAULT_DISTRICT, *REFERENCE_CASE)
+
+
+# --- FIGURE BUILDERS: CURRENT SITUATION ---
+def _layout(fig, title=None, yaxis=None, height=CHART_HEIGHT):
+    fig.update_layout(height=height, title_text=title, yaxis_title_text=yaxis)
+    return fig
+
+
+def energy_profile_figure(series, height=CHART_HEIGHT):
+    fig = go.Figure()
+    for name, key, color in [
+        ("Electricity Used", "electricity_used_kwh", "#64b5f6"),
+        ("Gas Used", "gas_used_kwh", "#f4a261"),
+        ("Electricity Generated", "electricity_generated_kwh", "#81c784"),
+    ]:
+        fig.add_bar(x=[name], y=[series[key]], name=name, marker_color=color)
+    return _layout(fig, "Current Yearly Energy Profile", "kWh", height)
+
+
+def gas_distribution_figure(series, height=CHART_HEIGHT):
+    on_gas = series["gas_connected_pct"]
+    fig = go.Figure(go.Pie(labels=["On Gas", "Not on Gas"], values=[on_gas, round(100 - on_gas, 2)]))
+    fig.update_layout(piecolorway=["rgb(103,0,31)", "rgb(178,24,43)"])
+    return _layout(fig, "Gas Connection Distribution", height=height)
+
+
+def solar_distribution_figure(series, height=CHART_HEIGHT):
+    with_solar = series["solar_pct"]
+    fig = go.Figure(go.Pie(labels=["With Solar Panels", "Without Solar Panels"],
+                           values=[with_solar, round(100 - with_solar, 2)]))
+    fig.update_layout(piecolorway=["#ffd54f", "#b0bec5"])
+    return _layout(fig, "Solar Panel Distribution", height=height)
+
+
+def grid_capacity_figure(series, height=CHART_HEIGHT):
+    fig = go.Figure()
+    for name, color in [("MV Grid", "#f9844a"), ("HV Grid", "#e07a5f")]:
+        fig.add_bar(x=[name], y=[series["grid_remaining_mw"][name]], name=name, marker_color=color)
+    return _layout(fig, "Remaining Capacity on Electricity Grid", "Remaining Capacity (MW)", height)
+
+
+# --- FIGURE BUILDERS: SCENARIO OUTCOME ---
+def _add_bands(fig, x, bands):
+    """P50 markers with P10-P90 whiskers from ``montecarlo.simulate`` entries."""
+    fig.add_scatter(
+        x=x, y=[band["p50"] for band in bands], mode="markers", name="P50 (P10–P90)",
+        marker={"color": "#37474f", "size": 9, "symbol": "diamond"},
+        error_y={"type": "data", "symmetric": False, "color": "#37474f", "thickness": 2,
+                 "array": [band["p90"] - band["p50"] for band in bands],
+                 "arrayminus": [band["p50"] - band["p10"] for band in bands]},
+    )
+    fig.update_layout(showlegend=True, legend={"orientation": "h", "y": -0.15})
+
+
+def production_figure(res, height=CHART_HEIGHT, bands=None):
+    # No current bar without the district's own figure: the reference case's is city-scale
+    current = res.get("current_production_kwh")
+    if current is None:
+        fig = go.Figure(go.Bar(x=["Simulated"], y=[res["production_kwh"]], marker_color=["#81c784"],
+                               name="Deterministic"))
+        title = "Simulated Annual Production (kWh)"
+    else:
+        fig = go.Figure(go.Bar(x=["Current", "Simulated"], y=[current, res["production_kwh"]],
+                               marker_color=["#64b5f6", "#81c784"], name="Deterministic"))
+        title = "Current vs Simulated Annual Production (kWh)"
+    if bands:
+        _add_bands(fig, ["Simulated"], [bands["production_kwh"]])
+    return _layout(fig, title, "kWh", height)
+
+
+def storage_figure(res, height=CHART_HEIGHT):
+    fig = go.Figure(go.Bar(x=["Max Energy Produced", "Storage Capacity"],
+                           y=[res["production_kwh"], res["storage_kwh"]],
+                           marker_color=["#4db6ac", "#ffb74d"]))
+    return _layout(fig, "Max Energy Produced vs Storage Capacity (kWh)", "kWh", height)
+
+
+def panels_figure(res, height=CHART_HEIGHT):
+    fig = go.Figure(go.Indicator(mode="number", value=res["panels"],
+                                 title_text="Total Solar Panels Installed",
+                                 number_font_size=48))
+    return _layout(fig, height=height)
+
+
+def payback_figure(res, height=CHART_HEIGHT, bands=None):
+    fig = go.Figure(go.Bar(x=["Panel Payback", "Storage Payback"],
+                           y=[res["panel_payback_yr"], res["storage_payback_yr"]],
+                           name="Payback Time (yrs)", marker_color=["#a5d6a7", "#ffe082"]))
+    if bands:
+        _add_bands(fig, ["Panel Payback", "Storage Payback"],
+                   [bands["panel_payback_yr"], bands["storage_payback_yr"]])
+    return _layout(fig, "Payback Time (Panels & Storage)", "Years", height)
+
+
+def investment_figure(res, height=CHART_HEIGHT):
+    fig = go.Figure(go.Bar(x=["Panel Cost", "Storage Cost"],
+                           y=[res["panel_cost_eur"], res["storage_cost_eur"]],
+                           name="Investment (€)", marker_color=["#f06292", "#9575cd"]))
+    return _layout(fig, "Investment Cost (Panels & Storage)", "€", height)
+
+
+def production_profile_figure(hourly_kwh, height=CHART_HEIGHT):
+    """Daily totals and the daily peak hour of an 8760-hour production series."""
+    days = np.asarray(hourly_kwh).reshape(-1, 24)
+    dates = np.arange("2025-01-01", len(days), dtype="datetime64[D]")
+    fig = go.Figure()
+    fig.add_scatter(x=dates, y=days.sum(axis=1).round(1), name="Daily production (kWh)",
+                    line_color="#81c784")
+    fig.add_scatter(x=dates, y=days.max(axis=1).round(1), name="Peak hour (kWh)",
+                    line_color="#f9844a", yaxis="y2")
+    fig.update_layout(yaxis2={"overlaying": "y", "side": "right", "title_text": "kWh per hour"},
+                      legend={"orientation": "h", "y": -0.15})
+    return _layout(fig, "Simulated Production Through the Year", "kWh per day", height)
+
+
+def storage_curve_figure(curve, height=CHART_HEIGHT, sized_kwh=None):
+    """Self-sufficiency and self-consumption against battery capacity (a ``storage.run`` sweep)."""
+    fig = go.Figure()
+    for name, key, color in [("Self-sufficiency", "self_sufficiency", "#4db6ac"),
+                             ("Self-consumption", "self_consumption", "#ffb74d")]:
+        fig.add_scatter(x=curve["capacity_kwh"].round(1), y=(curve[key] * 100).round(2), name=name,
+                        mode="lines+markers", line_color=color)
+    if sized_kwh:
+        fig.add_vline(x=sized_kwh, line_dash="dot", annotation_text="Sized battery")
+    fig.update_layout(xaxis_title_text="Battery capacity (kWh)", legend={"orientation": "h", "y": -0.2})
+    return _layout(fig, "Battery Size vs Self-Sufficiency", "%", height)
+
+
+def tornado_figure(rows, height=CHART_HEIGHT, label="Net present value (€)"):
+    """Horizontal swings around the base value, from ``finance.tornado`` rows."""
+    rows = rows[::-1]  # largest swing on top
+    base = rows[0]["base"] if rows else 0.0
+    fig = go.Figure()
+    for name, key, color in [("Low value", "low", "#f06292"), ("High value", "high", "#81c784")]:
+        fig.add_bar(y=[row["label"] for row in rows], x=[row[key] - base for row in rows], base=base,
+                    orientation="h", name=name, marker_color=color)
+    fig.update_layout(barmode="overlay", xaxis_title_text=label, legend={"orientation": "h", "y": -0.2})
+    return _layout(fig, "What Moves the Outcome Most", height=height)
+
+
+def heatmap_figure(data, height=CHART_HEIGHT):
+    """``data``: ``z`` (y x x), ``x``/``y`` axis values and their labels, ``label`` for the colour bar."""
+    fig = go.Figure(go.Heatmap(z=np.round(data["z"], 1), x=np.round(data["x"], 4), y=np.round(data["y"], 4),
+                               colorscale="RdYlGn", zmid=0 if data.get("diverging") else None,
+                               colorbar_title_text=data["label"]))
+    fig.update_layout(xaxis_title_text=data["x_label"])
+    return _layout(fig, f"{data['label']} (median over the other parameters)", data["y_label"], height)
+
+
+# --- DRAWING ---
+def plot(builder, data, height=CHART_HEIGHT, **options):
+    """Build a chart with ``builder`` and draw it, timed as ``chart.<name>``."""
+    with span(f"chart.{builder.__name__.removesuffix('_figure')}"):
+        st.plotly_chart(builder(data, height=height, **options), theme=None)
+
+
+# --- SEEDING ---
+def _payload_values(name):
+    with open(PAYLOAD_DIR / f"{name}.json", encoding="utf-8") as f:
+        data = json.load(f)["data"]
+    return {trace.get("name") or i: trace for i, trace in enumerate(data)}
+
+
+def seed_store(path=STORE_PATH):
+    """Rebuild the reference entry from the archived offline chart payloads."""
+    energy = _payload_values("current_energy_profile")
+    grid = _payload_values("current_grid_capacity")
+    gas = _payload_values("current_gas_distribution")[0]
+    solar = _payload_values("current_solar_distribution")[0]
+    production = _payload_values("fig1_production")[0]["y"]
+    storage = _payload_values("fig2_storage")[0]["y"]
+    panels = _payload_values("fig3_panels")[0]["value"]
+    investment = _payload_values("fig_investment_only")["Investment (€)"]["y"]
+    payback = _payload_values("fig_payback_only")["Payback Time (yrs)"]["y"]
+
+    reference = {
+        "overview": {
+            "electricity_used_kwh": energy["Electricity Used"]["y"][0],
+            "gas_used_kwh": energy["Gas Used"]["y"][0],
+            "electricity_generated_kwh": energy["Electricity Generated"]["y"][0],
+            "gas_connected_pct": gas["values"][0],
+            "solar_pct": solar["values"][0],
+            "grid_remaining_mw": {name: grid[name]["y"][0] for name in ("MV Grid", "HV Grid")},
+        },
+        "results": {
+            scenario_key(*REFERENCE_CASE): {
+                "current_production_kwh": production[0],
+                "production_kwh": round(production[1], 2),
+                "storage_kwh": storage[1],
+                "panels": panels,
+                "panel_cost_eur": investment[0],
+                "storage_cost_eur": investment[1],
+                "panel_payback_yr": payback[0],
+                "storage_payback_yr": payback[1],
+            },
+        },
+    }
+
+    store = {"version": 1, "districts": {}}
+    if Path(path).exists():
+        with open(path, encoding="utf-8") as f:
+            store = json.load(f)
+    store["districts"][DEFAULT_DISTRICT] = reference
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(store, f, indent=1, ensure_ascii=False)
+    print(f"{path}: {Path(path).stat().st_size:,} bytes")
+
+
+if __name__ == "__main__":
+    seed_store()
@@ -0,0 +1,128 @@
+"""Financial sensitivity of a PV installation.
+
+Investment, first-year savings, net present value and payback are closed
+form in the parameters, so any grid of parameter values is evaluated as
+one broadcast NumPy expression; a 10 x 10 x 10 x 10 x 10 grid (10^5
+combinations) takes a few milliseconds.
+
+With savings ``S`` in the first year, degradation ``g``, discount rate ``r``
+and lifetime ``N`` years, ``q = (1 - g) / (1 + r)``:
+
+    NPV              = -I + S / (1 + r) * (1 - q^N) / (1 - q)
+    payback          = ln(1 - I g / S) / ln(1 - g)        (I / S when g = 0)
+    discounted       = ln(1 - I (1 - q)(1 + r) / S) / ln q
+
+A payback that is never reached (the log argument is not positive) is
+``inf``. Production is valued at the electricity tariff for
+the self-consumed share and at the feed-in tariff for the rest. The battery
+is left out; ``solar.storage`` covers it.
+
+    sweep = grid(panels=2400, production_kwh=650_000, self_consumption=0.8)
+    heatmap(sweep, "tariff_eur_per_kwh", "panel_price_eur")
+"""
+import numpy as np
+
+from solar import engine
+
+LIFETIME_YEARS = 25
+# name -> (label, base, low, high); low/high bound the sweeps and the tornado
+PARAMETERS = {
+    "panel_price_eur": ("Panel price (€/panel)", engine.PANEL_COST_EUR, 400.0, 800.0),
+    "tariff_eur_per_kwh": ("Electricity tariff (€/kWh)", engine.ELECTRICITY_PRICE_EUR_PER_KWH, 0.12, 0.35),
+    "feed_in_eur_per_kwh": ("Feed-in tariff (€/kWh)", engine.FEED_IN_PRICE_EUR_PER_KWH, 0.0, 0.15),
+    "discount_rate": ("Discount rate", 0.04, 0.0, 0.08),
+    "degradation": ("Degradation (per year)", 0.005, 0.0, 0.01),
+}
+METRICS = {
+    "npv_eur": "Net present value (€)",
+    "payback_yr": "Payback (years)",
+    "discounted_payback_yr": "Discounted payback (years)",
+}
+
+
+def base_values():
+    return {name: spec[1] for name, spec in PARAMETERS.items()}
+
+
+def _log_ratio(numerator, denominator):
+    with np.errstate(divide="ignore", invalid="ignore"):
+        out = np.log(numerator) / np.log(denominator)
+    return np.where(numerator > 0, out, np.inf)
+
+
+def evaluate(panels, production_kwh, self_consumption=1.0, lifetime=LIFETIME_YEARS, **params):
+    """Financials for any broadcastable parameter arrays; missing ones take their base value."""
+    unknown = set(params) - set(PARAMETERS)
+    if unknown:
+        raise TypeError(f"unknown parameters: {', '.join(sorted(unknown))}")
+    p = {**base_values(), **params}
+    g, r = np.asarray(p["degradation"], dtype=float), np.asarray(p["discount_rate"], dtype=float)
+
+    investment = panels * np.asarray(p["panel_price_eur"], dtype=float)
+    savings = production_kwh * (self_consumption * np.asarray(p["tariff_eur_per_kwh"], dtype=float)
+                                + (1 - self_consumption) * np.asarray(p["feed_in_eur_per_kwh"], dtype=float))
+    q = (1 - g) / (1 + r)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        annuity = np.where(np.isclose(q, 1), lifetime, (1 - q**lifetime) / (1 - q)) / (1 + r)
+        share = investment / savings
+        payback = np.where(g > 0, _log_ratio(1 - share * g, 1 - g), share)
+        discounted = np.where(np.isclose(q, 1), share * (1 + r),
+                              _log_ratio(1 - share * (1 - q) * (1 + r), q))
+    bad = ~(savings > 0)
+    return {
+        "investment_eur": np.broadcast_to(investment, np.broadcast(investment, savings, q).shape),
+        "savings_eur": savings,
+        "npv_eur": savings * annuity - investment,
+        "payback_yr": np.where(bad, np.inf, payback),
+        "discounted_payback_yr": np.where(bad, np.inf, discounted),
+    }
+
+
+def grid(panels, production_kwh, self_consumption=1.0, points=10, names=None):
+    """Every combination of ``points`` values per parameter, one axis per parameter.
+
+    Returns ``{"axes": {name: values}, <metric>: ndarray}`` with the axes in
+    ``names`` order (default: all parameters).
+    """
+    names = list(names or PARAMETERS)
+    axes = {name: np.linspace(*PARAMETERS[name][2:], points) for name in names}
+    shaped = {}
+    for i, (name, values) in enumerate(axes.items()):
+        shape = [1] * len(axes)
+        shape[i] = -1
+        shaped[name] = values.reshape(shape)
+    result = evaluate(panels, production_kwh, self_consumption, **shaped)
+    return {"axes": axes, **result}
+
+
+def heatmap(sweep, x, y, metric="npv_eur", stat=np.median):
+    """``metric`` over the ``y`` x ``x`` plane, other parameters reduced with ``stat``."""
+    names = list(sweep["axes"])
+    values = np.broadcast_to(sweep[metric], tuple(len(v) for v in sweep["axes"].values()))
+    others = tuple(i for i, name in enumerate(names) if name not in (x, y))
+    plane = stat(values, axis=others) if others else values
+    # Remaining axes are in names order; put y first
+    return plane if names.index(y) < names.index(x) else plane.T
+
+
+def tornado(panels, production_kwh, self_consumption=1.0, metric="npv_eur"):
+    """One-at-a-time swings of ``metric``, largest first: ``[{name, label, low, high, base}]``."""
+    base = float(evaluate(panels, production_kwh, self_consumption)[metric])
+    rows = []
+    for name, (label, _, low, high) in PARAMETERS.items():
+        values = evaluate(panels, production_kwh, self_consumption, **{name: np.array([low, high])})[metric]
+        rows.append({"name": name, "label": label, "low": float(values[0]), "high": float(values[1]),
+                     "base": base})
+    return sorted(rows, key=lambda row: -abs(row["high"] - row["low"]))
+
+
+def summary(sweep, metric="npv_eur"):
+    values = np.asarray(sweep[metric]).ravel()
+    finite = values[np.isfinite(values)]
+    return {
+        "combinations": values.size,
+        "p10": float(np.percentile(finite, 10)) if finite.size else np.nan,
+        "p50": float(np.percentile(finite, 50)) if finite.size else np.nan,
+        "p90": float(np.percentile(finite, 90)) if finite.size else np.nan,
+        "share_positive": float((values > 0).mean()),
+    }
@@ -0,0 +1,85 @@
+"""Shared district geodata.
+
+The shapefile is converted once to GeoParquet in EPSG:4326 with the derived
+attributes the pages need, so no page parses the shapefile or reprojects on
+a cold start:
+
+    name, wijknummer, area_m2, centroid_lat, centroid_lon,
+    minx, miny, maxx, maxy, geometry
+
+Areas and centroids are computed in the Dutch RD New projection
+(EPSG:28992) and only then converted to lon/lat; centroids of lon/lat
+polygons are skewed. Rebuild after replacing the shapefile:
+
+    python -m solar.geodata
+"""
+from functools import lru_cache
+from pathlib import Path
+
+import geopandas as gpd
+
+from solar.timing import span
+
+ROOT = Path(__file__).resolve().parent.parent
+SHAPEFILE = ROOT / "assets" / "Wijkgrenzen_Zwolle.shp"
+PARQUET = ROOT / "data" / "districts.parquet"
+NAME_COLUMN = "OMSCHR"
+PROJECTED_CRS = 28992
+
+
+def from_shapefile(path=SHAPEFILE):
+    """Districts with derived attributes, straight from the shapefile."""
+    raw = gpd.read_file(path)
+    projected = raw.to_crs(epsg=PROJECTED_CRS)
+    centroids = projected.geometry.centroid.to_crs(epsg=4326)
+    districts = raw.to_crs(epsg=4326)
+    bounds = districts.geometry.bounds
+    return gpd.GeoDataFrame(
+        {
+            "name": districts[NAME_COLUMN],
+            "wijknummer": districts["WIJKNUMMER"],
+            "area_m2": projected.geometry.area,
+            "centroid_lat": centroids.y,
+            "centroid_lon": centroids.x,
+            "minx": bounds["minx"],
+            "miny": bounds["miny"],
+            "maxx": bounds["maxx"],
+            "maxy": bounds["maxy"],
+            # Pages and tools still address districts by the shapefile column
+            NAME_COLUMN: districts[NAME_COLUMN],
+        },
+        geometry=districts.geometry,
+        crs="EPSG:4326",
+    )
+
+
+def build(path=PARQUET):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    from_shapefile().to_parquet(path, index=False)
+    print(f"{path}: {path.stat().st_size:,} bytes")
+
+
+@lru_cache(maxsize=None)
+def load_districts(path=PARQUET):
+    """Process-wide district table (shared, do not modify in place).
+
+    Falls back to the shapefile when the GeoParquet file has not been built.
+    """
+    with span("geodata.load"):
+        if Path(path).exists():
+            return gpd.read_parquet(path)
+        return from_shapefile()
+
+
+def district(name):
+    """Row (a Series) for one district."""
+    districts = load_districts()
+    return districts.loc[districts["name"] == name].iloc[0]
+
+
+def district_names():
+    return sorted(load_districts()["name"])
+
+
+if __name__ == "__main__":
+    build()
@@ -0,0 +1,172 @@
+"""Shared page header.
+
+Every page used to read ``assets/solar.jpg`` (2.8 MB) and inline it as a
+base64 data URI on each rerun, together with its own copy of the header CSS.
+The build step below writes small derivatives to ``static/header/``, which
+Streamlit serves (and browsers cache) at ``app/static/header/``:
+
+    python -m solar.header
+
+``render_header()`` then only sends the markup and a URL. Without the built
+files, or with static serving turned off, it falls back to a downscaled data
+URI that is encoded once and shared through ``solar.content``.
+"""
+import base64
+import io
+from pathlib import Path
+
+import streamlit as st
+
+from solar import content
+from solar.timing import span
+
+ROOT = Path(__file__).resolve().parent.parent
+SOURCE_IMAGE = ROOT / "assets" / "solar.jpg"
+HEADER_DIR = ROOT / "static" / "header"
+STATIC_URL = "app/static/header"
+# The image is shown 210 px wide; 420 px covers 2x displays
+IMAGE_WIDTH = 420
+FORMATS = {"avif": {"quality": 55}, "webp": {"quality": 75}, "jpeg": {"quality": 80, "optimize": True}}
+
+HEADER_CSS = """
+    .figma-header {
+        background-color: #c8bab2;
+        display: flex;
+        justify-content: space-between;
+        align-items: center;
+        padding: 0;
+        margin: 0 0 %(margin_bottom)s 0;
+    }
+    .figma-header-left {
+        display: flex;
+        align-items: center;
+    }
+    .figma-header-left picture {
+        display: contents;
+    }
+    .figma-solar-image {
+        width: 210px;
+        height: 100%%;
+        object-fit: cover;
+    }
+    .figma-title-block {
+        padding: 20px 40px;
+        text-align: center;
+        flex-grow: 1;
+    }
+    .figma-title {
+        font-size: 24px;
+        font-weight: bold;
+        color: black;
+        margin-bottom: 6px;
+        font-family: Georgia, serif;
+    }
+    .figma-subtitle {
+        font-size: 15px;
+        font-style: italic;
+        color: black;
+    }
+    .figma-zwolle {
+        background-color: #3a65a8;
+        color: white;
+        padding: 15px 30px;
+        font-weight: bold;
+        font-size: 20px;
+        font-family: Georgia, serif;
+    }
+
+    /* Yellow buttons */
+    .yellow-btn > button {
+        background-color: #ffdd57;
+        color: black;
+        font-weight: bold;
+        border-radius: 30px;
+        padding: 12px 24px;
+        font-size: 16px;
+        font-family: Georgia, serif;
+        border: none;
+    }
+    .yellow-btn > button:hover {
+        background-color: #f7cd45;
+        transform: scale(1.01);
+    }
+
+    .stRadio > div, .stMultiSelect > div {
+        background-color: transparent;
+    }
+"""
+
+HEADER_HTML = """
+<style>%(css)s</style>
+
+<div class="figma-header">
+    <div class="figma-header-left">
+        %(image)s
+    </div>
+    <div class="figma-title-block">
+        <div class="figma-title">WELCOME TO THE ZWOLLE SOLAR DASHBOARD</div>
+        <div class="figma-subtitle">Track, Simulate & Optimize Solar Energy in Your District</div>
+    </div>
+    <div class="figma-zwolle">Zwolle</div>
+</div>
+"""
+
+
+# --- BUILD STEP ---
+def _resized(source=SOURCE_IMAGE, width=IMAGE_WIDTH):
+    from PIL import Image
+
+    with Image.open(source) as image:
+        height = round(image.height * width / image.width)
+        return image.convert("RGB").resize((width, height), Image.LANCZOS)
+
+
+def build(out_dir=HEADER_DIR):
+    from PIL import features
+
+    out_dir.mkdir(parents=True, exist_ok=True)
+    image = _resized()
+    for fmt, options in FORMATS.items():
+        if fmt in ("avif", "webp") and not features.check(fmt):
+            print(f"skipping {fmt}: not supported by this Pillow build")
+            continue
+        path = out_dir / f"solar-{IMAGE_WIDTH}.{'jpg' if fmt == 'jpeg' else fmt}"
+        image.save(path, fmt.upper(), **options)
+        print(f"{path}: {path.stat().st_size:,} bytes")
+
+
+# --- RENDERING ---
+def _encode_fallback(path):
+    with span("header.encode"):
+        buffer = io.BytesIO()
+        _resized(path).save(buffer, "JPEG", **FORMATS["jpeg"])
+        return "data:image/jpeg;base64," + base64.b64encode(buffer.getvalue()).decode()
+
+
+def _fallback_data_uri():
+    # Re-encoded when assets/solar.jpg changes
+    return content.load(SOURCE_IMAGE, _encode_fallback)
+
+
+def _image_tag(static_serving):
+    alt = 'class="figma-solar-image" alt="Solar Panel"'
+    built = {fmt: HEADER_DIR / f"solar-{IMAGE_WIDTH}.{fmt}" for fmt in ("avif", "webp", "jpg")}
+    if not static_serving or not built["jpg"].exists():
+        return f'<img {alt} src="{_fallback_data_uri()}">'
+    sources = "".join(
+        f'<source type="image/{fmt}" srcset="{STATIC_URL}/{path.name}">'
+        for fmt, path in built.items() if fmt != "jpg" and path.exists()
+    )
+    return f'<picture>{sources}<img {alt} src="{STATIC_URL}/{built["jpg"].name}"></picture>'
+
+
+def render_header(margin_bottom="2rem"):
+    """Draw the shared header with its stylesheet."""
+    with span("header.render"):
+        image = _image_tag(bool(st.get_option("server.enableStaticServing")))
+        css = HEADER_CSS % {"margin_bottom": margin_bottom}
+        st.markdown(HEADER_HTML % {"css": css, "image": image}, unsafe_allow_html=True)
+
+
+if __name__ == "__main__":
+    build()
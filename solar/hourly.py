@@ -0,0 +1,203 @@
+"""Hourly (8760-step) PV production per district.
+
+The annual engine multiplies installed kWp by one specific yield. This model
+spreads the same installations over a typical year, hour by hour:
+
+* solar position for every hour of the year (one location for the whole
+  city: the districts are a few km apart, well below what changes the sun's
+  path);
+* horizontal irradiance from a typical meteorological year in
+  ``data/tmy.csv`` (PVGIS TMY export), or, without it, a clear-sky model
+  (Haurwitz, Erbs diffuse split);
+* irradiance on each roof group's plane (isotropic sky), turned into kWh
+  per installed kWp with a performance ratio and, with TMY temperatures,
+  cell temperature losses;
+* every group's yield scaled so that a kWp yields
+  ``engine.SPECIFIC_YIELD_KWH_PER_KWP`` a year. The annual engine stays the
+  source of annual totals; this model only spreads them over the hours, so
+  the results page's hourly and annual numbers agree for any usage mix.
+
+Roof groups are panel orientations; every usage spreads its panels over
+them with fixed shares. The per-group yields form an ``(hours x groups)``
+array computed once per process (the TMY variant through the content cache,
+so a replaced file is picked up), and production for every district is a
+single matrix product with the ``(groups x districts)`` installed kWp:
+
+    kwh = hourly_production(load_roofs(), "All", [1, 2], 0.5)  # (8760, districts)
+"""
+from functools import lru_cache
+from pathlib import Path
+
+import numpy as np
+
+from solar import content, engine
+from solar.roofs import USAGES, load_roofs
+
+ROOT = Path(__file__).resolve().parent.parent
+TMY_PATH = ROOT / "data" / "tmy.csv"
+
+HOURS = 8760
+# Bump when the per-kWp yields change; part of weather_version()
+YIELD_VERSION = 2
+LATITUDE = 52.516
+LONGITUDE = 6.083
+
+# (name, tilt deg, azimuth deg clockwise from north)
+ROOF_GROUPS = [
+    ("flat-south", 13.0, 180.0),
+    ("pitched-south", 35.0, 180.0),
+    ("pitched-east", 35.0, 90.0),
+    ("pitched-west", 35.0, 270.0),
+]
+# Share of a usage's panels per roof group, rows in USAGES order
+USAGE_GROUP_SHARE = np.array([
+    [1.0, 0.0, 0.0, 0.0],   # Industrial: flat roofs
+    [0.0, 0.4, 0.3, 0.3],   # Residential: pitched roofs
+    [0.6, 0.2, 0.1, 0.1],   # Other
+])
+PERFORMANCE_RATIO = 0.85
+ALBEDO = 0.2
+# Cell temperature model (TMY only): NOCT and power temperature coefficient
+NOCT_C = 45.0
+TEMPERATURE_COEFFICIENT = -0.004
+
+
+# --- SOLAR GEOMETRY ---
+@lru_cache(maxsize=None)
+def solar_position(latitude=LATITUDE, longitude=LONGITUDE):
+    """Zenith, azimuth (radians) and extraterrestrial irradiance at every mid-hour (UTC)."""
+    hour = np.arange(HOURS) + 0.5
+    day = hour // 24
+    gamma = 2 * np.pi / 365 * (day + (hour % 24 - 12) / 24)
+    equation_of_time = 229.18 * (0.000075 + 0.001868 * np.cos(gamma) - 0.032077 * np.sin(gamma)
+                                 - 0.014615 * np.cos(2 * gamma) - 0.040849 * np.sin(2 * gamma))
+    declination = (0.006918 - 0.399912 * np.cos(gamma) + 0.070257 * np.sin(gamma)
+                   - 0.006758 * np.cos(2 * gamma) + 0.000907 * np.sin(2 * gamma)
+                   - 0.002697 * np.cos(3 * gamma) + 0.00148 * np.sin(3 * gamma))
+    solar_minutes = (hour % 24) * 60 + equation_of_time + 4 * longitude
+    hour_angle = np.radians(solar_minutes / 4 - 180)
+    phi = np.radians(latitude)
+    cos_zenith = np.sin(phi) * np.sin(declination) + np.cos(phi) * np.cos(declination) * np.cos(hour_angle)
+    zenith = np.arccos(np.clip(cos_zenith, -1, 1))
+    azimuth = np.mod(np.arctan2(np.sin(hour_angle),
+                                np.cos(hour_angle) * np.sin(phi) - np.tan(declination) * np.cos(phi)) + np.pi,
+                     2 * np.pi)
+    extraterrestrial = 1367.0 * (1 + 0.033 * np.cos(2 * np.pi * (day + 1) / 365))
+    return zenith, azimuth, extraterrestrial
+
+
+# --- IRRADIANCE ---
+def split_diffuse(ghi, zenith, extraterrestrial):
+    """Direct normal and diffuse horizontal irradiance from GHI (Erbs)."""
+    cos_zenith = np.cos(zenith)
+    up = cos_zenith > 0.065  # below ~86 deg the direct part is noise
+    with np.errstate(divide="ignore", invalid="ignore"):
+        kt = np.where(up, ghi / (extraterrestrial * cos_zenith), 0.0)
+    kt = np.clip(kt, 0, 1)
+    kd = np.where(kt <= 0.22, 1 - 0.09 * kt,
+                  np.where(kt <= 0.8,
+                           0.9511 - 0.1604 * kt + 4.388 * kt**2 - 16.638 * kt**3 + 12.336 * kt**4,
+                           0.165))
+    dhi = np.where(up, ghi * kd, ghi)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        dni = np.where(up, (ghi - dhi) / cos_zenith, 0.0)
+    return dni, dhi
+
+
+def clear_sky(zenith, extraterrestrial):
+    """Clear-sky GHI, DNI and DHI (W/m2)."""
+    cos_zenith = np.cos(zenith)
+    with np.errstate(divide="ignore", over="ignore"):
+        ghi = np.where(cos_zenith > 0, 1098.0 * cos_zenith * np.exp(-0.057 / cos_zenith), 0.0)
+    return (ghi, *split_diffuse(ghi, zenith, extraterrestrial))
+
+
+def read_tmy(path):
+    """GHI, DNI, DHI and air temperature from a PVGIS TMY CSV (8760 hourly rows)."""
+    import pandas as pd
+
+    with open(path, encoding="utf-8") as f:
+        header = next(i for i, line in enumerate(f) if line.startswith("time(UTC)"))
+    df = pd.read_csv(path, skiprows=header, nrows=HOURS, usecols=["G(h)", "Gb(n)", "Gd(h)", "T2m"])
+    if len(df) != HOURS:
+        raise ValueError(f"{path}: expected {HOURS} hourly rows, found {len(df)}")
+    return tuple(df[column].to_numpy(dtype=float) for column in ("G(h)", "Gb(n)", "Gd(h)", "T2m"))
+
+
+def plane_yield(ghi, dni, dhi, temperature=None):
+    """kWh per installed kWp for every hour and roof group: ``(hours, groups)``."""
+    zenith, azimuth, _ = solar_position()
+    tilt = np.radians([g[1] for g in ROOF_GROUPS])
+    orientation = np.radians([g[2] for g in ROOF_GROUPS])
+    cos_incidence = (np.cos(zenith)[:, None] * np.cos(tilt)
+                     + np.sin(zenith)[:, None] * np.sin(tilt) * np.cos(azimuth[:, None] - orientation))
+    poa = (dni[:, None] * np.clip(cos_incidence, 0, None)
+           + dhi[:, None] * (1 + np.cos(tilt)) / 2
+           + ghi[:, None] * ALBEDO * (1 - np.cos(tilt)) / 2)
+    kwh = poa / 1000 * PERFORMANCE_RATIO
+    if temperature is not None:
+        cell = temperature[:, None] + poa * (NOCT_C - 20) / 800
+        kwh *= 1 + TEMPERATURE_COEFFICIENT * (cell - 25)
+    return kwh
+
+
+def _annual_yield(kwh):
+    # Per group, so any mix of groups adds up to the engine's annual yield
+    return kwh * (engine.SPECIFIC_YIELD_KWH_PER_KWP / kwh.sum(axis=0))
+
+
+def _tmy_yield(path):
+    ghi, dni, dhi, temperature = read_tmy(path)
+    return _annual_yield(plane_yield(ghi, dni, dhi, temperature))
+
+
+@lru_cache(maxsize=None)
+def _clear_sky_yield():
+    zenith, _, extraterrestrial = solar_position()
+    return _annual_yield(plane_yield(*clear_sky(zenith, extraterrestrial)))
+
+
+def group_yield(path=TMY_PATH):
+    """``(hours, groups)`` kWh per kWp, from the TMY file when there is one (do not modify)."""
+    if Path(path).exists():
+        return content.load(path, _tmy_yield, nbytes=HOURS * len(ROOF_GROUPS) * 8)
+    return _clear_sky_yield()
+
+
+def irradiance_source(path=TMY_PATH):
+    return "tmy" if Path(path).exists() else "clear-sky"
+
+
+def weather_version(path=TMY_PATH):
+    """Cheap fingerprint of the yields and their weather input, like ``roofs.data_version``."""
+    path = Path(path)
+    if not path.exists():
+        return f"{YIELD_VERSION}-clear-sky"
+    stat = path.stat()
+    return f"{YIELD_VERSION}-{stat.st_size}-{stat.st_mtime_ns}"
+
+
+# --- PRODUCTION ---
+def group_kwp(roofs, scenario, levels, adoption, panels=None):
+    """Installed kWp per roof group and district: ``(groups, districts)``."""
+    if panels is None:
+        panels = engine.roof_panels(roofs)
+    selected = np.where(engine.selection_mask(roofs, scenario, levels, adoption), panels, 0.0)
+    n = len(roofs.districts)
+    by_usage = np.bincount(roofs.district.astype(np.int64) * len(USAGES) + roofs.usage,
+                           weights=selected, minlength=n * len(USAGES)).reshape(n, len(USAGES))
+    return (by_usage @ USAGE_GROUP_SHARE).T * engine.PANEL_KWP
+
+
+def hourly_production(roofs, scenario, levels, adoption, panels=None):
+    """kWh produced in every hour of the year by every district: ``(hours, districts)``."""
+    return group_yield() @ group_kwp(roofs, scenario, levels, adoption, panels)
+
+
+def run(district, scenario, level_labels, percentage):
+    """Hourly kWh of one district, ``(hours,)``."""
+    roofs = load_roofs()
+    production = hourly_production(roofs, scenario, engine.parse_levels(level_labels),
+                                   engine.parse_percentage(percentage))
+    # A copy: a column view would keep every district's hours alive in the prefetch store
+    return np.ascontiguousarray(production[:, roofs.code(district)])
@@ -0,0 +1,205 @@
+"""Roof table ingestion from a building footprint file.
+
+Reads a BAG-style footprint file (GeoPackage, shapefile or GeoParquet; one
+polygon per building with a usage function and a roof suitability class)
+in chunks, assigns every building to the district containing a point on
+its surface through the shared ``DistrictIndex``, and streams the result
+into ``data/roofs.parquet``:
+
+    district  dictionary string   area_m2  float32
+    usage     dictionary string   level    int8
+
+One row group per chunk, so memory is bounded by the chunk size whatever
+the size of the input. The file is written next to the target and renamed
+at the end. The scenario cube keys on the roof data, so rebuild it
+afterwards (``python -m solar.cube``).
+
+    python -m solar.ingest footprints.gpkg [--layer pand] [--chunk-rows 50000]
+        [--area-column roof_area_m2] [--usage-column gebruiksdoel]
+        [--level-column suitability] [--out data/roofs.parquet]
+
+Without an area column the polygon area is used (in metres: footprints in
+a geographic CRS are projected to RD New first). Usage values are mapped
+with ``USAGE_VALUES`` and default to ``Other``; buildings without a valid
+suitability level or outside every district are counted and skipped.
+
+A GeoParquet geometry column without a ``crs`` key is in OGC:CRS84, as the
+GeoParquet spec defines. Only a source that declares no CRS at all (a
+shapefile without .prj, ``"crs": null``) is taken to be RD New.
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.parquet as pq
+import shapely
+
+from solar.geo import DistrictIndex
+from solar.geodata import PROJECTED_CRS, SHAPEFILE
+from solar.roofs import LEVELS, ROOFS_PATH
+
+CHUNK_ROWS = 50_000
+# GeoParquet: a geometry column without a "crs" key is in this CRS
+GEOPARQUET_DEFAULT_CRS = "OGC:CRS84"
+# Lower-cased source values -> USAGES entry (BAG gebruiksdoel and plain labels)
+USAGE_VALUES = {
+    "woonfunctie": "Residential",
+    "residential": "Residential",
+    "industriefunctie": "Industrial",
+    "industrial": "Industrial",
+}
+SCHEMA = pa.schema([
+    ("district", pa.dictionary(pa.int16(), pa.string())),
+    ("area_m2", pa.float32()),
+    ("usage", pa.dictionary(pa.int8(), pa.string())),
+    ("level", pa.int8()),
+])
+
+
+# --- READING ---
+def _parquet_chunks(path, columns, chunk_rows):
+    source = pq.ParquetFile(path)
+    geo = json.loads(source.schema_arrow.metadata[b"geo"])
+    geometry_column = geo["primary_column"]
+    crs = geo["columns"][geometry_column].get("crs", GEOPARQUET_DEFAULT_CRS)
+    for batch in source.iter_batches(batch_size=chunk_rows, columns=[*columns, geometry_column]):
+        yield batch, batch.column(geometry_column), crs
+
+
+def _ogr_chunks(path, layer, columns, chunk_rows):
+    from pyogrio import open_arrow
+
+    stream = open_arrow(path, layer=layer, columns=columns, batch_size=chunk_rows, use_pyarrow=True)
+    with stream as (meta, reader):
+        for batch in reader:
+            yield batch, batch.column(meta["geometry_name"] or "wkb_geometry"), meta["crs"]
+
+
+def iter_chunks(path, columns, layer=None, chunk_rows=CHUNK_ROWS):
+    """``(attribute batch, WKB geometry column, crs)`` per chunk of at most ``chunk_rows`` buildings."""
+    if Path(path).suffix.lower() == ".parquet":
+        return _parquet_chunks(path, columns, chunk_rows)
+    return _ogr_chunks(path, layer, columns, chunk_rows)
+
+
+# --- JOINING ---
+class _Projector:
+    """Reprojects chunk coordinates into the districts' CRS (cached per source CRS)."""
+
+    def __init__(self):
+        self._transformers = {}
+
+    def __call__(self, geometries, crs, target):
+        from pyproj import CRS, Transformer
+
+        source = CRS.from_user_input(crs) if crs else CRS.from_epsg(PROJECTED_CRS)
+        if source == target:
+            return geometries
+        key = source.to_wkt()
+        if key not in self._transformers:
+            self._transformers[key] = Transformer.from_crs(source, target, always_xy=True)
+        transformer = self._transformers[key]
+        return shapely.transform(geometries, lambda xy: np.column_stack(transformer.transform(xy[:, 0], xy[:, 1])))
+
+
+def district_index(crs=PROJECTED_CRS, path=SHAPEFILE):
+    import geopandas as gpd
+
+    return DistrictIndex.from_frame(gpd.read_file(path).to_crs(crs))
+
+
+def _usage_labels(values):
+    return np.array([USAGE_VALUES.get(str(value).strip().lower(), "Other") for value in values], dtype=object)
+
+
+def join_chunk(index, batch, geometries, area_column, usage_column, level_column):
+    """Roof rows of one chunk as a ``SCHEMA`` table, and how many buildings were skipped."""
+    x, y = shapely.get_coordinates(shapely.point_on_surface(geometries)).T
+    codes = index.locate(x, y)
+    if area_column:
+        area = batch.column(area_column).to_numpy(zero_copy_only=False).astype(np.float64)
+    else:
+        area = shapely.area(geometries)
+    level = np.asarray(batch.column(level_column).to_numpy(zero_copy_only=False), dtype=np.float64)
+    keep = (codes >= 0) & np.isin(level, LEVELS) & (area > 0)
+    if usage_column:
+        usage = _usage_labels(batch.column(usage_column).to_pylist())
+    else:
+        usage = np.full(len(codes), "Other", dtype=object)
+    table = pa.table({
+        "district": pa.array(index.names[codes[keep]].astype(str)).dictionary_encode(),
+        "area_m2": pa.array(area[keep], pa.float32()),
+        "usage": pa.array(usage[keep].astype(str)).dictionary_encode(),
+        "level": pa.array(level[keep].astype(np.int8)),
+    })
+    return table.cast(SCHEMA), {"outside": int((codes < 0).sum()),
+                                "invalid": int(((codes >= 0) & ~keep).sum())}
+
+
+# --- PIPELINE ---
+def _progress(stats, elapsed):
+    rate = stats["read"] / elapsed if elapsed else 0.0
+    print(f"\r{stats['read']:,} buildings read, {stats['written']:,} roofs written, "
+          f"{stats['outside']:,} outside districts, {stats['invalid']:,} invalid  {rate:,.0f}/s",
+          end="", file=sys.stderr, flush=True)
+
+
+def ingest(path, out=ROOFS_PATH, layer=None, chunk_rows=CHUNK_ROWS, area_column=None,
+           usage_column="gebruiksdoel", level_column="suitability"):
+    """Stream ``path`` into a roof table at ``out``; returns the counts."""
+    from pyproj import CRS
+
+    target = CRS.from_epsg(PROJECTED_CRS)
+    index = district_index(PROJECTED_CRS)
+    project = _Projector()
+    columns = [column for column in (area_column, usage_column, level_column) if column]
+    stats = {"read": 0, "written": 0, "outside": 0, "invalid": 0}
+    start = time.perf_counter()
+
+    out = Path(out)
+    out.parent.mkdir(parents=True, exist_ok=True)
+    tmp = out.with_name(f".{out.stem}.{os.getpid()}{out.suffix}")
+    try:
+        with pq.ParquetWriter(tmp, SCHEMA, compression="zstd") as writer:
+            for batch, wkb, crs in iter_chunks(path, columns, layer, chunk_rows):
+                geometries = project(shapely.from_wkb(wkb.to_numpy(zero_copy_only=False)), crs, target)
+                table, skipped = join_chunk(index, batch, geometries, area_column, usage_column, level_column)
+                writer.write_table(table)
+                stats["read"] += batch.num_rows
+                stats["written"] += table.num_rows
+                for key, n in skipped.items():
+                    stats[key] += n
+                _progress(stats, time.perf_counter() - start)
+        os.replace(tmp, out)
+    finally:
+        if tmp.exists():
+            tmp.unlink()
+    elapsed = time.perf_counter() - start
+    print(file=sys.stderr)
+    print(f"{stats['written']:,} roofs in {elapsed:.1f}s -> {out} ({out.stat().st_size:,} bytes); "
+          f"rebuild the cube with: python -m solar.cube", file=sys.stderr)
+    return stats
+
+
+# --- CLI ---
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build the roof table from a building footprint file.")
+    parser.add_argument("path", help="footprints (GeoPackage, shapefile or GeoParquet)")
+    parser.add_argument("--layer", help="layer name for multi-layer files")
+    parser.add_argument("--out", default=str(ROOFS_PATH))
+    parser.add_argument("--chunk-rows", type=int, default=CHUNK_ROWS)
+    parser.add_argument("--area-column", help="roof area in m2 (default: polygon area)")
+    parser.add_argument("--usage-column", default="gebruiksdoel")
+    parser.add_argument("--level-column", default="suitability", help="suitability class 1-3")
+    args = parser.parse_args(argv)
+    ingest(args.path, args.out, args.layer, args.chunk_rows, args.area_column, args.usage_column,
+           args.level_column)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,250 @@
+"""Level-of-detail district geometry.
+
+The build step simplifies the district polygons as one coverage, so
+neighbouring districts keep sharing exactly the same boundary, at a few
+tolerances. Each level is written as a TopoJSON topology: every shared
+boundary is stored once as an arc, and coordinates are quantized to an
+integer grid and delta-encoded.
+
+    LEVELS     tolerance  quantization  used for
+    city       25 m       1e4           whole-city map (zoom <= 12)
+    district   5 m        1e5           single district (zoom 13-14)
+    full       0          1e6           close-ups (zoom >= 15)
+
+Rebuild after replacing the shapefile:
+
+    python -m solar.lod
+"""
+import json
+from pathlib import Path
+
+import folium
+import geopandas as gpd
+import numpy as np
+import shapely
+
+from solar import content
+from solar.geo import DistrictIndex
+
+ROOT = Path(__file__).resolve().parent.parent
+SHAPEFILE = ROOT / "assets" / "Wijkgrenzen_Zwolle.shp"
+GEOMETRY_DIR = ROOT / "data" / "geometry"
+OBJECT_NAME = "districts"
+NAME_COLUMN = "OMSCHR"
+
+LEVELS = {
+    "city": (25.0, 10_000),
+    "district": (5.0, 100_000),
+    "full": (0.0, 1_000_000),
+}
+
+
+def level_for_zoom(zoom):
+    if zoom <= 12:
+        return "city"
+    if zoom <= 14:
+        return "district"
+    return "full"
+
+
+# --- ENCODING ---
+def _rings(geometry):
+    polygons = geometry.geoms if geometry.geom_type == "MultiPolygon" else [geometry]
+    return [[np.asarray(p.exterior.coords)] + [np.asarray(r.coords) for r in p.interiors] for p in polygons]
+
+
+def _quantize(coords, translate, scale):
+    q = np.round((coords[:, :2] - translate) / scale).astype(np.int64)
+    keep = np.ones(len(q), dtype=bool)
+    keep[1:] = np.any(q[1:] != q[:-1], axis=1)
+    # Open ring: drop the closing point, it is implied
+    return [tuple(p) for p in q[keep][:-1]]
+
+
+def encode_topology(geometries, properties, quantization):
+    """TopoJSON topology with shared arcs for a polygon coverage."""
+    minx, miny, maxx, maxy = shapely.total_bounds(geometries)
+    translate = np.array([minx, miny])
+    scale = np.array([(maxx - minx) / (quantization - 1), (maxy - miny) / (quantization - 1)])
+
+    # Quantized open rings, grouped as feature -> polygon -> ring ids
+    rings, layout = [], []
+    for geometry in geometries:
+        polygons = []
+        for polygon in _rings(geometry):
+            ids = []
+            for coords in polygon:
+                ring = _quantize(coords, translate, scale)
+                if len(ring) >= 3:
+                    ids.append(len(rings))
+                    rings.append(ring)
+            if ids:
+                polygons.append(ids)
+        layout.append(polygons)
+
+    # Which rings use every (undirected) edge
+    edge_rings = {}
+    for ring_id, ring in enumerate(rings):
+        for a, b in zip(ring, ring[1:] + ring[:1]):
+            edge_rings.setdefault((min(a, b), max(a, b)), set()).add(ring_id)
+
+    def neighbours(a, b):
+        return edge_rings[(min(a, b), max(a, b))]
+
+    arcs, arc_index = [], {}
+
+    def add_arc(points):
+        key = tuple(points)
+        if key in arc_index:
+            return arc_index[key]
+        reverse = key[::-1]
+        if reverse in arc_index:
+            return ~arc_index[reverse]
+        arc_index[key] = len(arcs)
+        arcs.append(points)
+        return arc_index[key]
+
+    ring_arcs = []
+    for ring in rings:
+        n = len(ring)
+        # A junction is where the set of rings sharing the boundary changes
+        junctions = [i for i in range(n)
+                     if neighbours(ring[i - 1], ring[i]) != neighbours(ring[i], ring[(i + 1) % n])]
+        if not junctions:
+            # Unshared ring: start at its smallest point so a shared copy dedupes
+            start = min(range(n), key=ring.__getitem__)
+            ring = ring[start:] + ring[:start]
+            ring_arcs.append([add_arc(ring + ring[:1])])
+            continue
+        ids = []
+        for j, start in enumerate(junctions):
+            stop = junctions[(j + 1) % len(junctions)]
+            points = ring[start:stop + 1] if stop > start else ring[start:] + ring[:stop + 1]
+            ids.append(add_arc(points))
+        ring_arcs.append(ids)
+
+    encoded = []
+    for points in arcs:
+        points = np.asarray(points, dtype=np.int64)
+        encoded.append(np.vstack([points[:1], np.diff(points, axis=0)]).tolist())
+
+    objects = []
+    for polygons, props in zip(layout, properties):
+        arcs_of = [[ring_arcs[ring_id] for ring_id in polygon] for polygon in polygons]
+        if len(arcs_of) == 1:
+            objects.append({"type": "Polygon", "arcs": arcs_of[0], "properties": props})
+        else:
+            objects.append({"type": "MultiPolygon", "arcs": arcs_of, "properties": props})
+
+    return {
+        "type": "Topology",
+        "bbox": [minx, miny, maxx, maxy],
+        "transform": {"scale": scale.tolist(), "translate": translate.tolist()},
+        "objects": {OBJECT_NAME: {"type": "GeometryCollection", "geometries": objects}},
+        "arcs": encoded,
+    }
+
+
+# --- DECODING ---
+def _decode_arcs(topology):
+    scale = np.asarray(topology["transform"]["scale"])
+    translate = np.asarray(topology["transform"]["translate"])
+    return [np.cumsum(np.asarray(arc), axis=0) * scale + translate for arc in topology["arcs"]]
+
+
+def _stitch(arc_ids, arcs):
+    parts = []
+    for i, arc_id in enumerate(arc_ids):
+        points = arcs[arc_id] if arc_id >= 0 else arcs[~arc_id][::-1]
+        parts.append(points if i == 0 else points[1:])
+    return np.vstack(parts).tolist()
+
+
+def feature_collection(topology):
+    """Decode a topology built by ``encode_topology`` back to GeoJSON."""
+    arcs = _decode_arcs(topology)
+    features = []
+    for geometry in topology["objects"][OBJECT_NAME]["geometries"]:
+        if geometry["type"] == "Polygon":
+            coordinates = [_stitch(ring, arcs) for ring in geometry["arcs"]]
+        else:
+            coordinates = [[_stitch(ring, arcs) for ring in polygon] for polygon in geometry["arcs"]]
+        features.append({
+            "type": "Feature",
+            "properties": geometry["properties"],
+            "geometry": {"type": geometry["type"], "coordinates": coordinates},
+        })
+    return {"type": "FeatureCollection", "features": features}
+
+
+# --- BUILD ---
+def build(out_dir=GEOMETRY_DIR):
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    districts = gpd.read_file(SHAPEFILE)
+    properties = [{"name": name} for name in districts[NAME_COLUMN]]
+    geojson_size = len(json.dumps(districts[[NAME_COLUMN, "geometry"]].to_crs(epsg=4326).__geo_interface__))
+    for level, (tolerance, quantization) in LEVELS.items():
+        geometries = districts.geometry.values
+        if tolerance:
+            # Simplify in metres (EPSG:28992), as one coverage so borders stay shared
+            geometries = shapely.coverage_simplify(np.asarray(geometries), tolerance)
+        lonlat = gpd.GeoSeries(geometries, crs=districts.crs).to_crs(epsg=4326).values
+        topology = encode_topology(np.asarray(lonlat), properties, quantization)
+        path = out_dir / f"{OBJECT_NAME}.{level}.topojson"
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(topology, f, separators=(",", ":"), ensure_ascii=False)
+        print(f"{level}: {path.stat().st_size:,} bytes ({geojson_size:,} as full GeoJSON), "
+              f"{len(topology['arcs'])} arcs")
+
+
+# --- MAP LAYERS ---
+def _path(level):
+    return GEOMETRY_DIR / f"{OBJECT_NAME}.{level}.topojson"
+
+
+def load_topology(level):
+    return content.load_json(_path(level))
+
+
+def _decode_features(path):
+    return {f["properties"]["name"]: f for f in feature_collection(content.read_json(path))["features"]}
+
+
+def _features(level):
+    return content.load(_path(level), _decode_features)
+
+
+def district_feature(name, level="district"):
+    """One district as a GeoJSON feature at the given level of detail."""
+    return _features(level)[name]
+
+
+def district_index(zoom):
+    """Point lookup over the geometry ``districts_layer(zoom)`` draws, so a click
+    resolves to the outline drawn under it (queries in lon/lat)."""
+    features = _features(level_for_zoom(zoom))
+    geometries = [shapely.geometry.shape(feature["geometry"]) for feature in features.values()]
+    return DistrictIndex(geometries, list(features))
+
+
+def _restylable(topology):
+    # folium writes each feature's style into its properties: copy those, share the arcs
+    collection = topology["objects"][OBJECT_NAME]
+    geometries = [{**g, "properties": dict(g["properties"])} for g in collection["geometries"]]
+    return {**topology, "objects": {OBJECT_NAME: {**collection, "geometries": geometries}}}
+
+
+def districts_layer(zoom, name="Districts", style_function=None):
+    """All districts as one TopoJSON layer, at the level matching ``zoom``."""
+    return folium.TopoJson(
+        _restylable(load_topology(level_for_zoom(zoom))),
+        f"objects.{OBJECT_NAME}",
+        name=name,
+        style_function=style_function,
+        tooltip=folium.GeoJsonTooltip(fields=["name"], labels=False),
+    )
+
+
+if __name__ == "__main__":
+    build()
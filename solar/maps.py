@@ -0,0 +1,88 @@
+"""Folium maps that are built and serialized once per process.
+
+``st_folium`` re-renders the whole folium tree to HTML/JS on every call,
+which dominates a rerun for the district map. ``SerializedMap`` does that
+work once and replays the result into the st_folium frontend component, so
+reruns only send the (cached) component arguments.
+
+This mirrors the body of ``streamlit_folium.st_folium`` and relies on its
+private module-level helpers, so streamlit-folium is pinned in
+requirements.txt; check this module before raising the pin.
+"""
+import streamlit as st
+from branca.colormap import ColorMap
+from folium.plugins import DualMap
+from streamlit_folium import _component_func, _get_header, _get_html, _get_map_string, generate_js_hash, get_full_id
+
+from solar.timing import span
+
+
+# Colormap legends draw with d3, which st_folium loads first for them
+COLORMAP_JS = ["https://d3js.org/d3.v4.min.js", "https://cdnjs.cloudflare.com/ajax/libs/d3/3.5.5/d3.min.js"]
+
+
+def _walk(elem):
+    yield elem
+    if isinstance(elem, DualMap):
+        yield from _walk(elem.m1)
+        yield from _walk(elem.m2)
+    for child in getattr(elem, "_children", {}).values():
+        yield from _walk(child)
+
+
+def _links(fig):
+    # Document order matters: leaflet.js has to load before its plugins
+    css, js = [], []
+    for elem in _walk(fig):
+        if isinstance(elem, ColorMap):
+            js[:0] = COLORMAP_JS
+        css.extend(href for _, href in getattr(elem, "default_css", []))
+        js.extend(src for _, src in getattr(elem, "default_js", []))
+    return list(dict.fromkeys(css)), list(dict.fromkeys(js))
+
+
+class SerializedMap:
+    def __init__(self, fig):
+        with span("map.serialize"):
+            fig.get_root().render()
+            fig.render()
+            self.html = _get_html(fig)
+            self.header = _get_header(fig)
+            self.script = _get_map_string(fig)
+            self.id = get_full_id(fig)
+            self.zoom = fig.options.get("zoom")
+            self.css_links, self.js_links = _links(fig)
+        self.size = len(self.html) + len(self.header) + len(self.script)
+
+    def show(self, key, height=700, width=500, returned_objects=("last_object_clicked",)):
+        """Draw the map; same return value as ``st_folium``."""
+        hash_key = generate_js_hash(self.script, key, False)
+        defaults = {name: None for name in returned_objects}
+        if "zoom" in defaults:
+            defaults["zoom"] = self.zoom
+
+        def _on_change():
+            st.session_state[key] = st.session_state.get(hash_key, {})
+
+        with span("map.st_folium"):
+            return _component_func(
+                script=self.script,
+                header=self.header,
+                html=self.html,
+                id=self.id,
+                key=hash_key,
+                height=height,
+                width=width,
+                returned_objects=list(returned_objects),
+                default=defaults,
+                zoom=None,
+                center=None,
+                feature_group=None,
+                return_on_hover=False,
+                layer_control=None,
+                pixelated=False,
+                css_links=self.css_links,
+                js_links=self.js_links,
+                on_change=_on_change,
+                wrap_longitude=False,
+            )
@@ -0,0 +1,164 @@
+"""Monte Carlo uncertainty of a scenario outcome.
+
+The engine gives one deterministic answer. Here the inputs it takes as
+fixed are drawn instead:
+
+* the irradiance year: annual yield varies around the typical year by
+  ``WEATHER_SD``;
+* the adoption actually reached, uniform between ``ADOPTION_FLOOR`` times
+  the chosen percentage and the percentage itself. Roofs still adopt in
+  their fixed rank order, so panels follow from a cumulative sum over the
+  selected roofs;
+* panel efficiency, the panel and storage prices and the electricity tariff.
+
+Draws are made in chunks of ``CHUNK`` as flat arrays, and every chunk is
+folded into a fixed-size histogram per metric, so memory does not grow with
+the number of draws. Percentiles are read back from the histograms. The
+bins span the first chunk's range with a margin on both sides; later values
+outside it land in under/overflow counts, and percentiles in those fall
+back to the exact minimum or maximum.
+
+The generator is seeded, so the same selection always gives the same bands.
+
+    bands = simulate("Binnenstad", "All", ["Level 1"], "50%")
+    bands["production_kwh"]["p10"], bands["production_kwh"]["p90"]
+"""
+import numpy as np
+
+from solar import engine
+from solar.roofs import load_roofs
+
+DRAWS = 5000
+CHUNK = 1000
+BINS = 512
+SEED = 20240601
+
+WEATHER_SD = 0.05
+EFFICIENCY_SD = 0.03
+PRICE_SD = 0.10
+TARIFF_SD = 0.15
+ADOPTION_FLOOR = 0.7
+
+METRICS = ["production_kwh", "panels", "investment_eur", "panel_payback_yr", "storage_payback_yr"]
+
+
+class StreamingHistogram:
+    """Fixed-bin histogram with under/overflow counts and exact extremes."""
+
+    def __init__(self, low, high, bins=BINS):
+        if not high > low:
+            high = low + max(abs(low), 1.0) * 1e-6
+        self.edges = np.linspace(low, high, bins + 1)
+        self.counts = np.zeros(bins + 2, dtype=np.int64)  # [under, bins..., over]
+        self.nonfinite = 0
+        self.total = 0
+        self.sum = 0.0
+        self.min = np.inf
+        self.max = -np.inf
+
+    @classmethod
+    def spanning(cls, values, bins=BINS, margin=0.25):
+        finite = values[np.isfinite(values)]
+        if not finite.size:
+            return cls(0.0, 1.0, bins)
+        low, high = float(finite.min()), float(finite.max())
+        pad = (high - low) * margin
+        return cls(low - pad, high + pad, bins)
+
+    def add(self, values):
+        finite = values[np.isfinite(values)]
+        self.nonfinite += values.size - finite.size
+        if not finite.size:
+            return
+        index = np.searchsorted(self.edges, finite, side="right")
+        # Values equal to the top edge belong to the last bin
+        index[finite == self.edges[-1]] = len(self.edges) - 1
+        self.counts += np.bincount(index, minlength=len(self.counts))
+        self.total += finite.size
+        self.sum += float(finite.sum())
+        self.min = min(self.min, float(finite.min()))
+        self.max = max(self.max, float(finite.max()))
+
+    def percentile(self, q):
+        if not self.total:
+            return np.nan
+        target = q / 100 * self.total
+        cumulative = np.cumsum(self.counts)
+        i = int(np.searchsorted(cumulative, target, side="left"))
+        if i == 0:
+            return self.min
+        if i == len(self.counts) - 1:
+            return self.max
+        before = cumulative[i - 1]
+        inside = (target - before) / self.counts[i] if self.counts[i] else 0.0
+        low, high = self.edges[i - 1], self.edges[i]
+        return float(np.clip(low + inside * (high - low), self.min, self.max))
+
+    def mean(self):
+        return self.sum / self.total if self.total else np.nan
+
+
+def _adoption_curve(roofs, code, scenario, levels):
+    """Sorted adoption ranks of the selected roofs and the cumulative panels up to each."""
+    part = roofs.slice(roofs.districts[code])
+    mask = engine.selection_mask(roofs, scenario, levels, np.inf)[part]
+    ranks = roofs.rank[part][mask]
+    panels = engine.roof_panels(roofs)[part][mask]
+    order = np.argsort(ranks)
+    return ranks[order], np.concatenate([[0.0], np.cumsum(panels[order])])
+
+
+def _draw(rng, n, ranks, cumulative, adoption):
+    weather = rng.normal(1.0, WEATHER_SD, n)
+    efficiency = rng.normal(1.0, EFFICIENCY_SD, n)
+    reached = rng.uniform(ADOPTION_FLOOR * adoption, adoption, n)
+    panel_price = engine.PANEL_COST_EUR * np.maximum(rng.normal(1.0, PRICE_SD, n), 0.1)
+    storage_price = engine.STORAGE_COST_EUR_PER_KWH * np.maximum(rng.normal(1.0, PRICE_SD, n), 0.1)
+    tariff = engine.ELECTRICITY_PRICE_EUR_PER_KWH * rng.lognormal(0.0, TARIFF_SD, n)
+
+    panels = cumulative[np.searchsorted(ranks, reached, side="left")]
+    production = (panels * engine.PANEL_KWP * engine.SPECIFIC_YIELD_KWH_PER_KWP
+                  * weather * efficiency)
+    storage_kwh = production / 365 * engine.STORAGE_DAYS
+    panel_cost = panels * panel_price
+    storage_cost = storage_kwh * storage_price
+    panel_savings = production * tariff
+    storage_savings = (storage_kwh * engine.STORAGE_CYCLES_PER_YEAR
+                       * (tariff - engine.FEED_IN_PRICE_EUR_PER_KWH))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        panel_payback = np.where(panel_savings > 0, panel_cost / panel_savings, np.inf)
+        storage_payback = np.where(storage_savings > 0, storage_cost / storage_savings, np.inf)
+    return {
+        "production_kwh": production,
+        "panels": panels,
+        "investment_eur": panel_cost + storage_cost,
+        "panel_payback_yr": panel_payback,
+        "storage_payback_yr": storage_payback,
+    }
+
+
+def simulate(district, scenario, level_labels, percentage, draws=DRAWS, chunk=CHUNK, seed=SEED):
+    """P10/P50/P90 and mean of every metric: ``{metric: {"p10", "p50", "p90", "mean"}, "draws": n}``.
+
+    Draws whose payback is never reached are left out of the payback
+    percentiles and counted in ``{metric}["never"]``.
+    """
+    roofs = load_roofs()
+    ranks, cumulative = _adoption_curve(roofs, roofs.code(district), scenario, engine.parse_levels(level_labels))
+    adoption = engine.parse_percentage(percentage)
+    rng = np.random.default_rng(seed)
+
+    histograms = None
+    for start in range(0, draws, chunk):
+        values = _draw(rng, min(chunk, draws - start), ranks, cumulative, adoption)
+        if histograms is None:
+            histograms = {metric: StreamingHistogram.spanning(values[metric]) for metric in METRICS}
+        for metric in METRICS:
+            histograms[metric].add(values[metric])
+
+    out = {"draws": draws}
+    for metric, histogram in histograms.items():
+        out[metric] = {f"p{q}": histogram.percentile(q) for q in (10, 50, 90)}
+        out[metric]["mean"] = histogram.mean()
+        out[metric]["never"] = histogram.nonfinite
+    return out
@@ -0,0 +1,174 @@
+"""Background precompute, shared by every session of the process.
+
+Picking a district on Home starts the work its later pages will need, on a
+small thread pool, while the user is still reading the district and
+scenario pages:
+
+    district(name)                       geometry, overview figures
+    scenario(name, scenario)             outcomes of every level set and
+                                         percentage of that scenario
+    selection(name, scenario, levels, %) the results page's outcome and the
+                                         hourly, battery and uncertainty
+                                         models behind its expanders
+
+Work is keyed on the function, its arguments and the model, roof table and
+weather versions (``resultcache.versions()``), so two sessions asking for
+the same district share one future and a new data or weather file is not
+answered from old work. Pages read results with ``get(fn, *args)``: a
+finished future is returned as is, a running one is waited for (timed as
+``prefetch.wait``), and anything never prefetched is computed inline and
+kept for the next session. At most ``MAX_ENTRIES`` finished results are
+kept, least recently used first out.
+
+Results of the simulation models (``PERSISTENT``) also go through the disk
+cache in ``solar.resultcache``, so another process, a restart or a second
+replica reads them back instead of computing them again.
+
+``SOLAR_PREFETCH_WORKERS`` sets the pool size (default 2; 0 disables
+background work, ``get`` then always computes inline).
+"""
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+
+
+from solar import cube, engine, figures, geodata, hourly, lod, montecarlo, resultcache, storage
+from solar.batch import level_sets
+from solar.timing import span
+
+WORKERS = int(os.environ.get("SOLAR_PREFETCH_WORKERS", 2))
+MAX_ENTRIES = 512
+
+_lock = threading.Lock()
+_futures = OrderedDict()  # key -> Future
+_pool = None
+_counters = {"submitted": 0, "shared": 0, "ready": 0, "waited": 0, "inline": 0}
+
+
+def _key(fn, args):
+    return (fn.__module__, fn.__qualname__, resultcache.freeze(args), resultcache.versions())
+
+
+def _compute(fn, args):
+    # The district view only warms this process's caches and outcomes are
+    # cube slices; both are cheaper to redo than to read back from disk
+    if fn in PERSISTENT:
+        return resultcache.call(fn, *args)
+    return fn(*args)
+
+
+def _executor():
+    global _pool
+    if _pool is None:
+        _pool = ThreadPoolExecutor(max_workers=WORKERS, thread_name_prefix="solar-prefetch")
+    return _pool
+
+
+def _trim():
+    # Oldest finished entries go first; running ones are kept until done
+    for key in list(_futures):
+        if len(_futures) <= MAX_ENTRIES:
+            break
+        if _futures[key].done():
+            del _futures[key]
+
+
+def _usable(future):
+    return future is not None and not (future.done() and future.exception() is not None)
+
+
+def submit(fn, *args):
+    """Start ``fn(*args)`` in the background unless it is already running or done."""
+    key = _key(fn, args)
+    with _lock:
+        future = _futures.get(key)
+        if _usable(future):
+            _futures.move_to_end(key)
+            _counters["shared"] += 1
+            return future
+        if not WORKERS:
+            return None
+        future = _executor().submit(_compute, fn, args)
+        _futures[key] = future
+        _counters["submitted"] += 1
+        _trim()
+    return future
+
+
+def get(fn, *args):
+    """``fn(*args)``, from a prefetched future when there is one."""
+    key = _key(fn, args)
+    with _lock:
+        future = _futures.get(key)
+        if _usable(future):
+            _futures.move_to_end(key)
+            _counters["ready" if future.done() else "waited"] += 1
+        else:
+            future = None
+            _counters["inline"] += 1
+    if future is not None:
+        if future.done():
+            return future.result()
+        with span("prefetch.wait"):
+            return future.result()
+
+    value = _compute(fn, args)
+    done = Future()
+    done.set_result(value)
+    with _lock:
+        _futures[key] = done
+        _trim()
+    return value
+
+
+def stats():
+    with _lock:
+        running = sum(not future.done() for future in _futures.values())
+        return {**_counters, "entries": len(_futures), "running": running, "workers": WORKERS}
+
+
+def clear():
+    with _lock:
+        _futures.clear()
+
+
+# --- TASK SETS ---
+def _district_view(name):
+    geodata.district(name)
+    lod.district_feature(name)
+    return figures.overview(name)
+
+
+def district(name):
+    """Everything the district pages need for ``name``."""
+    submit(_district_view, name)
+
+
+def scenario(name, scenario_name):
+    """Outcomes of every level set and percentage of one scenario."""
+    current = figures.current_production(name)
+    for level_labels in level_sets():
+        for percentage in engine.PERCENTAGES:
+            submit(cube.outcome, name, scenario_name, level_labels, percentage, current)
+
+
+def storage_sweep(name, scenario_name, level_labels, percentage):
+    """Battery size sweep around the outcome's battery (the results page's curve)."""
+    current = figures.current_production(name)
+    sized = get(cube.outcome, name, scenario_name, level_labels, percentage, current)["storage_kwh"]
+    return storage.run(name, scenario_name, level_labels, percentage, storage.sweep_sizes(sized))
+
+
+def selection(name, scenario_name, level_labels, percentage):
+    """The results page for one complete selection."""
+    current = figures.current_production(name)
+    args = (name, scenario_name, list(level_labels), percentage)
+    submit(cube.outcome, *args, current)
+    submit(montecarlo.simulate, *args)
+    submit(hourly.run, *args)
+    submit(storage.direct_self_consumption, *args)
+    submit(storage_sweep, *args)
+
+
+PERSISTENT = {montecarlo.simulate, hourly.run, storage.direct_self_consumption, storage_sweep}
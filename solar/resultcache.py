@@ -0,0 +1,205 @@
+"""Disk-backed result cache, shared by every process and restart.
+
+A simulation result depends only on its inputs and on the model and data
+behind it, so it is the same for every session, every server process and
+every replica. ``ResultCache`` keeps results as files in one directory:
+
+* the key is a SHA-256 of the function, its (frozen) arguments and
+  ``versions()``: the model version, the fingerprint of the roof table the
+  process loaded and the weather file fingerprint. A new model or data
+  file simply stops matching the old files, which age out;
+* a file is written next to its final name and renamed into place, so a
+  reader in any process sees either the whole result or none. Two
+  processes computing the same key both write it; the last rename wins;
+* a hit touches the file, and once the directory outgrows its byte budget
+  the least recently used files are removed down to ``LOW_WATER`` of it.
+  Every process keeps a running estimate of the size from its own writes
+  and rescans the directory when the estimate crosses the budget, or after
+  ``RESCAN_WRITES`` writes to catch up with the other processes;
+* unreadable files count as misses and are removed; a directory that
+  cannot be written to only costs the write (counted in ``errors``).
+
+Values are pickled: point ``SOLAR_RESULT_CACHE_DIR`` only at a directory the
+servers own (a shared volume for several replicas). The budget is
+``SOLAR_RESULT_CACHE_MB`` (default 256; 0 disables the cache). Bump
+``engine.MODEL_VERSION`` whenever a model's results change.
+
+    value = call(montecarlo.simulate, "Binnenstad", "All", ["Level 1"], "50%")
+"""
+import hashlib
+import os
+import pickle
+import threading
+from pathlib import Path
+
+import numpy as np
+
+from solar import engine, hourly
+from solar.roofs import load_roofs
+
+ROOT = Path(__file__).resolve().parent.parent
+CACHE_DIR = ROOT / "data" / "result_cache"
+DEFAULT_BUDGET_MB = 256
+# Eviction trims to this share of the budget, so it does not run on every write
+LOW_WATER = 0.8
+RESCAN_WRITES = 64
+FORMAT = 1
+SUFFIX = ".pkl"
+
+
+def freeze(value):
+    """Hashable, order-preserving form of call arguments (arrays by value)."""
+    if isinstance(value, np.ndarray):
+        return ("ndarray", value.dtype.str, value.shape, value.tobytes())
+    if isinstance(value, (list, tuple)):
+        return tuple(freeze(item) for item in value)
+    return value
+
+
+def versions():
+    # The loaded table's version: the results come from it, not from the file on disk now
+    return (engine.MODEL_VERSION, load_roofs().version, hourly.weather_version())
+
+
+def key(fn, args):
+    material = (FORMAT, fn.__module__, fn.__qualname__, freeze(args), versions())
+    return hashlib.sha256(pickle.dumps(material, protocol=4)).hexdigest()
+
+
+class ResultCache:
+    def __init__(self, directory, budget_bytes):
+        self.directory = Path(directory)
+        self.budget_bytes = budget_bytes
+        self._bytes = None  # estimate of the directory size, scanned on first write
+        self._unscanned = 0  # writes since the last scan
+        self._lock = threading.Lock()
+        self._counters = {"hits": 0, "misses": 0, "writes": 0, "evictions": 0, "errors": 0,
+                          "bytes_read": 0, "bytes_written": 0}
+
+    @property
+    def enabled(self):
+        return self.budget_bytes > 0
+
+    def _path(self, digest):
+        # Two-character fan-out keeps directories small
+        return self.directory / digest[:2] / f"{digest}{SUFFIX}"
+
+    def _count(self, name, n=1):
+        with self._lock:
+            self._counters[name] += n
+
+    def get(self, digest):
+        """``(True, value)`` for a stored result, else ``(False, None)``."""
+        path = self._path(digest)
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+            value = pickle.loads(data)
+        except FileNotFoundError:
+            self._count("misses")
+            return False, None
+        except Exception:
+            # Truncated by a crashed writer on a filesystem without atomic rename, or a stale format
+            self._count("misses")
+            self._count("errors")
+            self._unlink(path)
+            return False, None
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        with self._lock:
+            self._counters["hits"] += 1
+            self._counters["bytes_read"] += len(data)
+        return True, value
+
+    def put(self, digest, value):
+        path = self._path(digest)
+        tmp = path.with_name(f".{path.stem}.{os.getpid()}.{threading.get_ident()}.tmp")
+        try:
+            data = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+            path.parent.mkdir(parents=True, exist_ok=True)
+            with open(tmp, "wb") as f:
+                f.write(data)
+            os.replace(tmp, path)
+        except Exception:
+            self._count("errors")
+            self._unlink(tmp)
+            return
+        with self._lock:
+            self._counters["writes"] += 1
+            self._counters["bytes_written"] += len(data)
+            if self._bytes is not None:
+                self._bytes += len(data)
+            self._unscanned += 1
+            scan = (self._bytes is None or self._bytes > self.budget_bytes
+                    or self._unscanned >= RESCAN_WRITES)
+        if scan:
+            self.evict()
+
+    def _files(self):
+        files = []
+        for path in self.directory.glob(f"??/*{SUFFIX}"):
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue  # removed by another process
+            files.append((stat.st_mtime_ns, stat.st_size, path))
+        return files
+
+    def _unlink(self, path):
+        try:
+            path.unlink()
+            return True
+        except OSError:
+            return False
+
+    def evict(self):
+        """Rescan the directory and remove least recently used files past the budget."""
+        files = self._files()
+        total = sum(size for _, size, _ in files)
+        removed = 0
+        if total > self.budget_bytes:
+            for _, size, path in sorted(files):
+                if total <= self.budget_bytes * LOW_WATER:
+                    break
+                # Another process may have evicted it first; the bytes are gone either way
+                removed += self._unlink(path)
+                total -= size
+        with self._lock:
+            self._bytes = total
+            self._unscanned = 0
+            self._counters["evictions"] += removed
+
+    def clear(self):
+        for _, _, path in self._files():
+            self._unlink(path)
+        with self._lock:
+            self._bytes = 0
+
+    def stats(self):
+        with self._lock:
+            lookups = self._counters["hits"] + self._counters["misses"]
+            return {
+                **self._counters,
+                "hit_rate": self._counters["hits"] / lookups if lookups else 0.0,
+                "bytes": self._bytes or 0,
+                "budget_bytes": self.budget_bytes,
+            }
+
+
+CACHE = ResultCache(os.environ.get("SOLAR_RESULT_CACHE_DIR") or CACHE_DIR,
+                    int(float(os.environ.get("SOLAR_RESULT_CACHE_MB", DEFAULT_BUDGET_MB)) * 1024 * 1024))
+
+
+def call(fn, *args):
+    """``fn(*args)``, from disk when any process has computed it before."""
+    if not CACHE.enabled:
+        return fn(*args)
+    digest = key(fn, args)
+    found, value = CACHE.get(digest)
+    if found:
+        return value
+    value = fn(*args)
+    CACHE.put(digest, value)
+    return value
@@ -0,0 +1,158 @@
+"""Roof stock per district as flat NumPy arrays.
+
+All roofs of the municipality live in one ``RoofTable``: one array per
+attribute, sorted by district so a district is a contiguous slice. The
+simulation engine works on these arrays directly.
+
+The table is read from ``data/roofs.parquet`` (columns ``district``,
+``area_m2``, ``usage``, ``level``) when it exists. Until real footprint data
+is available it falls back to a seeded synthetic estimate derived from the
+district areas, flagged by ``RoofTable.source == "synthetic"``.
+
+``load_roofs`` keeps one table per process; its ``version`` is the
+``data_version()`` of the file it was read from, so anything keyed on the
+roof data follows the table actually in use, not a file replaced since.
+"""
+import zlib
+from dataclasses import dataclass, replace
+from functools import lru_cache
+from pathlib import Path
+
+import numpy as np
+
+ROOT = Path(__file__).resolve().parent.parent
+ROOFS_PATH = ROOT / "data" / "roofs.parquet"
+
+USAGES = ["Industrial", "Residential", "Other"]
+LEVELS = [1, 2, 3]
+
+# Synthetic roof stock: share, median area (m2) and spread per usage
+_SYNTHETIC_USAGE = {
+    "Industrial": (0.05, 800.0, 0.8),
+    "Residential": (0.80, 60.0, 0.4),
+    "Other": (0.15, 300.0, 0.8),
+}
+_SYNTHETIC_LEVEL_SHARE = [0.35, 0.40, 0.25]
+_SYNTHETIC_ROOFS_PER_KM2 = 900
+_SYNTHETIC_MAX_ROOFS = 9000
+
+
+@dataclass(frozen=True)
+class RoofTable:
+    districts: list      # district names, index = district code
+    district: np.ndarray  # int16 district code per roof, sorted
+    area: np.ndarray      # float64 roof area in m2
+    usage: np.ndarray     # int8 index into USAGES
+    level: np.ndarray     # int8 suitability level 1..3
+    rank: np.ndarray      # float64 in [0, 1): adoption order within the district
+    offsets: np.ndarray   # district i is roofs[offsets[i]:offsets[i + 1]]
+    source: str
+    version: str = ""     # data_version() of the source when loaded
+
+    def __len__(self):
+        return len(self.area)
+
+    def code(self, district):
+        return self.districts.index(district)
+
+    def slice(self, district):
+        i = self.code(district)
+        return slice(int(self.offsets[i]), int(self.offsets[i + 1]))
+
+    def subset(self, district):
+        """Single-district table (views, no copies)."""
+        part = self.slice(district)
+        n = part.stop - part.start
+        return RoofTable(
+            districts=[district],
+            district=np.zeros(n, dtype=np.int16),
+            area=self.area[part],
+            usage=self.usage[part],
+            level=self.level[part],
+            rank=self.rank[part],
+            offsets=np.array([0, n]),
+            source=self.source,
+            version=self.version,
+        )
+
+
+def _adoption_rank(district, n):
+    # Stable per district, so 25% adoption is always a subset of 50% etc.
+    rng = np.random.default_rng(zlib.crc32(f"rank:{district}".encode()))
+    return rng.random(n)
+
+
+def _table(names, district, area, usage, level, source):
+    order = np.argsort(district, kind="stable")
+    district = district[order].astype(np.int16)
+    counts = np.bincount(district, minlength=len(names))
+    offsets = np.concatenate([[0], np.cumsum(counts)])
+    rank = np.empty(len(district))
+    for i, name in enumerate(names):
+        rank[offsets[i]:offsets[i + 1]] = _adoption_rank(name, counts[i])
+    return RoofTable(
+        districts=list(names),
+        district=district,
+        area=area[order].astype(np.float64),
+        usage=usage[order].astype(np.int8),
+        level=level[order].astype(np.int8),
+        rank=rank,
+        offsets=offsets,
+        source=source,
+    )
+
+
+def synthesize_roofs(names, areas_m2):
+    """Seeded synthetic roof stock scaled by district area."""
+    parts = {"district": [], "area": [], "usage": [], "level": []}
+    usage_share = [share for share, _, _ in _SYNTHETIC_USAGE.values()]
+    for code, (name, area_m2) in enumerate(zip(names, areas_m2)):
+        rng = np.random.default_rng(zlib.crc32(name.encode()))
+        n = int(min(area_m2 / 1e6 * _SYNTHETIC_ROOFS_PER_KM2, _SYNTHETIC_MAX_ROOFS))
+        usage = rng.choice(len(USAGES), size=n, p=usage_share)
+        median = np.array([m for _, m, _ in _SYNTHETIC_USAGE.values()])[usage]
+        sigma = np.array([s for _, _, s in _SYNTHETIC_USAGE.values()])[usage]
+        parts["district"].append(np.full(n, code))
+        parts["area"].append(median * np.exp(sigma * rng.standard_normal(n)))
+        parts["usage"].append(usage)
+        parts["level"].append(rng.choice(LEVELS, size=n, p=_SYNTHETIC_LEVEL_SHARE))
+    return _table(names, *(np.concatenate(parts[k]) for k in parts), source="synthetic")
+
+
+def read_roofs(path, names):
+    """Roof table from a parquet file with district/area_m2/usage/level columns."""
+    import pandas as pd
+
+    df = pd.read_parquet(path, columns=["district", "area_m2", "usage", "level"])
+    df = df[df["district"].isin(names)]
+    return _table(
+        names,
+        df["district"].map({name: i for i, name in enumerate(names)}).to_numpy(),
+        df["area_m2"].to_numpy(),
+        df["usage"].map({usage: i for i, usage in enumerate(USAGES)}).fillna(USAGES.index("Other")).to_numpy(),
+        df["level"].to_numpy(),
+        source=str(path),
+    )
+
+
+def data_version(path=ROOFS_PATH):
+    """Cheap fingerprint of the roof data, without loading it."""
+    path = Path(path)
+    if not path.exists():
+        return "synthetic-1"
+    stat = path.stat()
+    return f"{stat.st_size}-{stat.st_mtime_ns}"
+
+
+@lru_cache(maxsize=None)
+def load_roofs(path=ROOFS_PATH):
+    """Process-wide roof table for every district in the shapefile."""
+    from solar.geodata import load_districts
+
+    # Fingerprint before reading: a file replaced mid-read is picked up by the next process
+    version = data_version(path)
+    districts = load_districts()
+    names = districts["name"].tolist()
+    if Path(path).exists():
+        return replace(read_roofs(path, names), version=version)
+    return replace(synthesize_roofs(names, districts["area_m2"].to_numpy()), version=version)
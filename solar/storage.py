@@ -0,0 +1,168 @@
+"""Battery storage dispatch over a year of hourly production and demand.
+
+Self-consumption first: surplus production charges the battery, deficits
+are served from it, and whatever is left is exported to or imported from
+the grid. Charging and discharging are limited by the battery's power
+(``C_RATE`` times its capacity), and the round-trip losses are split
+evenly between charging and discharging.
+
+The state of charge depends on the previous hour, so time is stepped hour
+by hour; every battery size and every district are advanced together as
+one ``(sizes, districts)`` array per step. A full size sweep for all
+districts is 8760 steps of small vector operations, instead of 8760 Python
+steps for every size and district.
+
+Demand is an estimate until metered profiles are available: an annual
+consumption per roof (households) or per m2 of roof (other usages), spread
+over a standard profile with morning and evening peaks and more use in
+winter.
+
+    curve = size_curve(load_roofs(), "All", [1, 2], 1.0, np.linspace(0, 5000, 11))
+"""
+from functools import lru_cache
+
+import numpy as np
+
+from solar import engine, hourly
+from solar.roofs import USAGES, load_roofs
+
+ROUND_TRIP_EFFICIENCY = 0.9
+# Charge/discharge power per kWh of capacity
+C_RATE = 0.5
+
+# --- DEMAND ESTIMATE ---
+# Annual kWh per roof for households, per m2 of roof for other usages
+HOUSEHOLD_KWH = 2800.0
+DEMAND_KWH_PER_M2 = {"Industrial": 120.0, "Other": 60.0}
+# Relative use per local hour of day
+DAILY_SHAPE = np.array([
+    0.55, 0.48, 0.45, 0.44, 0.45, 0.55, 0.80, 1.05, 1.05, 0.95, 0.92, 0.95,
+    1.00, 0.95, 0.92, 0.95, 1.10, 1.45, 1.70, 1.65, 1.50, 1.30, 1.00, 0.75,
+])
+UTC_OFFSET_HOURS = 1
+WINTER_SURPLUS = 0.25
+
+# Size sweep: capacities from none to this multiple of the engine's battery
+SWEEP_POINTS = 25
+SWEEP_MAX_FACTOR = 3.0
+
+
+@lru_cache(maxsize=None)
+def demand_profile():
+    """Share of the annual demand in every hour of the year (sums to 1)."""
+    day = np.arange(hourly.HOURS) // 24
+    local = np.roll(np.tile(DAILY_SHAPE, hourly.HOURS // 24), -UTC_OFFSET_HOURS)
+    seasonal = 1 + WINTER_SURPLUS * np.cos(2 * np.pi * (day + 10) / 365)
+    profile = local * seasonal
+    return profile / profile.sum()
+
+
+def annual_demand(roofs):
+    """Estimated annual electricity demand (kWh) of every district."""
+    per_roof = np.zeros(len(roofs))
+    residential = roofs.usage == USAGES.index("Residential")
+    per_roof[residential] = HOUSEHOLD_KWH
+    for usage, kwh_per_m2 in DEMAND_KWH_PER_M2.items():
+        mask = roofs.usage == USAGES.index(usage)
+        per_roof[mask] = roofs.area[mask] * kwh_per_m2
+    return np.bincount(roofs.district, weights=per_roof, minlength=len(roofs.districts))
+
+
+def hourly_demand(roofs):
+    """``(hours, districts)`` kWh."""
+    return np.outer(demand_profile(), annual_demand(roofs))
+
+
+# --- DISPATCH ---
+def dispatch(production, demand, capacity_kwh, efficiency=ROUND_TRIP_EFFICIENCY, c_rate=C_RATE):
+    """Simulate a year of battery operation for many sizes and districts at once.
+
+    ``production`` and ``demand`` are ``(hours, districts)`` kWh;
+    ``capacity_kwh`` is ``(sizes,)`` or ``(sizes, districts)``. Returns a
+    dict of ``(sizes, districts)`` arrays.
+    """
+    production = np.asarray(production, dtype=float)
+    demand = np.asarray(demand, dtype=float)
+    net = production - demand
+    surplus = np.maximum(net, 0.0)
+    deficit = np.maximum(-net, 0.0)
+    capacity = np.broadcast_to(np.asarray(capacity_kwh, dtype=float).reshape(len(capacity_kwh), -1),
+                               (len(capacity_kwh), net.shape[1])).copy()
+    power = capacity * c_rate
+    eta = np.sqrt(efficiency)
+
+    soc = np.zeros_like(capacity)
+    charged = np.zeros_like(capacity)      # taken from surplus
+    discharged = np.zeros_like(capacity)   # delivered to demand
+    step = np.empty_like(capacity)
+    # Skip the half of a step that has nothing to do in any district
+    for s, d, any_surplus, any_deficit in zip(surplus, deficit, surplus.any(axis=1), deficit.any(axis=1)):
+        if any_surplus:
+            # Charge: limited by surplus, power and free room
+            np.subtract(capacity, soc, out=step)
+            step /= eta
+            np.minimum(step, power, out=step)
+            np.minimum(step, s, out=step)
+            charged += step
+            step *= eta
+            soc += step
+        if any_deficit:
+            # Discharge: limited by deficit, power and stored energy
+            np.multiply(soc, eta, out=step)
+            np.minimum(step, power, out=step)
+            np.minimum(step, d, out=step)
+            discharged += step
+            step /= eta
+            soc -= step
+    np.maximum(soc, 0.0, out=soc)
+
+    total_production = production.sum(axis=0)
+    total_demand = demand.sum(axis=0)
+    grid_export = surplus.sum(axis=0) - charged
+    grid_import = deficit.sum(axis=0) - discharged
+    with np.errstate(divide="ignore", invalid="ignore"):
+        self_sufficiency = np.where(total_demand > 0, 1 - grid_import / total_demand, np.nan)
+        self_consumption = np.where(total_production > 0, 1 - grid_export / total_production, np.nan)
+        cycles = np.where(capacity > 0, discharged / capacity, 0.0)
+    return {
+        "capacity_kwh": capacity,
+        "grid_import_kwh": grid_import,
+        "grid_export_kwh": grid_export,
+        "battery_out_kwh": discharged,
+        "losses_kwh": charged - discharged - soc,
+        "self_sufficiency": self_sufficiency,
+        "self_consumption": self_consumption,
+        "cycles": cycles,
+    }
+
+
+def size_curve(roofs, scenario, levels, adoption, capacities_kwh, codes=None):
+    """Dispatch results for every capacity and district (or the ``codes`` subset)."""
+    production = hourly.hourly_production(roofs, scenario, levels, adoption)
+    demand = hourly_demand(roofs)
+    if codes is not None:
+        production, demand = production[:, codes], demand[:, codes]
+    return dispatch(production, demand, capacities_kwh)
+
+
+def direct_self_consumption(district, scenario, level_labels, percentage):
+    """Share of the production used on the spot, without a battery."""
+    roofs = load_roofs()
+    code = roofs.code(district)
+    production = hourly.hourly_production(roofs, scenario, engine.parse_levels(level_labels),
+                                          engine.parse_percentage(percentage))[:, code]
+    demand = hourly_demand(roofs)[:, code]
+    total = production.sum()
+    return float(np.minimum(production, demand).sum() / total) if total > 0 else 1.0
+
+
+def sweep_sizes(sized_kwh):
+    return np.linspace(0.0, SWEEP_MAX_FACTOR * sized_kwh, SWEEP_POINTS)
+
+
+def run(district, scenario, level_labels, percentage, capacities_kwh):
+    """Size sweep for one district: a dict of ``(sizes,)`` arrays."""
+    roofs = load_roofs()
+    curve = size_curve(roofs, scenario, engine.parse_levels(level_labels), engine.parse_percentage(percentage),
+                       capacities_kwh, codes=[roofs.code(district)])
+    return {key: values[:, 0] for key, values in curve.items()}
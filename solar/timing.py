@@ -0,0 +1,233 @@
+"""Named timing spans for the expensive steps of a rerun.
+
+Wrap a step in ``span(name)`` (or decorate it with ``timed(name)``). Every
+span is recorded twice:
+
+* in the current thread's list of spans, which ``debug_panel()`` drains at
+  the end of a page and shows in the sidebar when debugging is on
+  (``?debug=1`` in the URL, or ``SOLAR_DEBUG=1``);
+* in a process-wide histogram per span name, exported as JSON or in the
+  Prometheus text format. With ``SOLAR_METRICS_PORT`` set, the first page
+  run starts a small HTTP server that serves them at ``/metrics`` and
+  ``/metrics.json``. Both exports include the ``solar.content`` and
+  ``solar.resultcache`` counters. A port that cannot be bound (say, taken
+  by another worker) is reported once and the app runs without it.
+
+Span names are dotted, stage first: ``geodata.load``, ``map.build``,
+``map.st_folium``, ``chart.<name>``, ``header.render``, ``header.encode``,
+``simulation.compute``, ``simulation.hourly``, ``simulation.storage``,
+``simulation.finance``, ``simulation.montecarlo``, ``prefetch.wait``. Spans
+inside cached functions only fire on a cache miss, which is exactly when
+they matter.
+"""
+import json
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from functools import wraps
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from solar import content, resultcache
+
+# Histogram bucket upper bounds in seconds (Prometheus ``le`` labels)
+BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+# Spans kept per thread until a panel drains them
+MAX_SPANS = 256
+METRIC_NAME = "solar_span_seconds"
+
+_lock = threading.Lock()
+_histograms = {}
+_local = threading.local()
+_server = None
+_serve_error = None  # why the endpoint could not start; not retried
+
+
+class _Histogram:
+    __slots__ = ("counts", "sum", "count", "max")
+
+    def __init__(self):
+        self.counts = [0] * (len(BUCKETS) + 1)
+        self.sum = 0.0
+        self.count = 0
+        self.max = 0.0
+
+    def observe(self, seconds):
+        i = 0
+        while i < len(BUCKETS) and seconds > BUCKETS[i]:
+            i += 1
+        self.counts[i] += 1
+        self.sum += seconds
+        self.count += 1
+        self.max = max(self.max, seconds)
+
+
+def _spans():
+    spans = getattr(_local, "spans", None)
+    if spans is None:
+        spans = _local.spans = []
+        _local.depth = 0
+    return spans
+
+
+def _observe(name, seconds):
+    with _lock:
+        histogram = _histograms.get(name)
+        if histogram is None:
+            histogram = _histograms[name] = _Histogram()
+        histogram.observe(seconds)
+
+
+# --- RECORDING ---
+@contextmanager
+def span(name):
+    spans = _spans()
+    depth = _local.depth
+    _local.depth = depth + 1
+    # Reserve the slot now so nested spans are listed after their parent;
+    # threads nobody drains (no panel) stop listing, histograms still count
+    slot = None
+    if len(spans) < MAX_SPANS:
+        slot = len(spans)
+        spans.append([name, None, depth])
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        seconds = time.perf_counter() - start
+        _local.depth = depth
+        if slot is not None:
+            spans[slot][1] = seconds
+        _observe(name, seconds)
+
+
+def timed(name):
+    """Decorator form of ``span``."""
+    def decorate(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            with span(name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorate
+
+
+def take_spans():
+    """``(name, seconds, depth)`` of every finished span of this thread since the last call."""
+    spans = _spans()
+    finished = [tuple(entry) for entry in spans if entry[1] is not None]
+    spans.clear()
+    return finished
+
+
+# --- EXPORT ---
+def snapshot():
+    """Aggregated histograms: ``{name: {"count", "sum", "max", "buckets": {le: cumulative}}}``."""
+    with _lock:
+        items = [(name, list(h.counts), h.sum, h.count, h.max) for name, h in _histograms.items()]
+    out = {}
+    for name, counts, total, count, longest in sorted(items):
+        cumulative, buckets = 0, {}
+        for bound, n in zip([*map(str, BUCKETS), "+Inf"], counts):
+            cumulative += n
+            buckets[bound] = cumulative
+        out[name] = {"count": count, "sum": total, "max": longest, "buckets": buckets}
+    return out
+
+
+def to_json():
+    return json.dumps({"metric": METRIC_NAME, "spans": snapshot(), "content_cache": content.CACHE.stats(),
+                       "result_cache": resultcache.CACHE.stats()}, indent=1)
+
+
+def to_prometheus():
+    lines = [f"# HELP {METRIC_NAME} Duration of named dashboard steps.",
+             f"# TYPE {METRIC_NAME} histogram"]
+    for name, histogram in snapshot().items():
+        label = name.replace("\\", "\\\\").replace('"', '\\"')
+        for bound, n in histogram["buckets"].items():
+            lines.append(f'{METRIC_NAME}_bucket{{span="{label}",le="{bound}"}} {n}')
+        lines.append(f'{METRIC_NAME}_sum{{span="{label}"}} {histogram["sum"]:.6f}')
+        lines.append(f'{METRIC_NAME}_count{{span="{label}"}} {histogram["count"]}')
+    for prefix, stats in (("content_cache", content.CACHE.stats()), ("result_cache", resultcache.CACHE.stats())):
+        for key, value in stats.items():
+            kind = "gauge" if key in ("entries", "bytes", "budget_bytes", "hit_rate") else "counter"
+            suffix = "" if kind == "gauge" else "_total"
+            lines.append(f"# TYPE solar_{prefix}_{key}{suffix} {kind}")
+            lines.append(f"solar_{prefix}_{key}{suffix} {value}")
+    return "\n".join(lines) + "\n"
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path == "/metrics":
+            body, content_type = to_prometheus(), "text/plain; version=0.0.4"
+        elif self.path == "/metrics.json":
+            body, content_type = to_json(), "application/json"
+        else:
+            self.send_error(404)
+            return
+        data = body.encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def serve(port, host="0.0.0.0"):
+    """Serve the histograms over HTTP from a daemon thread (once per process).
+
+    Returns ``None`` when the port cannot be bound; that is only tried once.
+    """
+    global _server, _serve_error
+    with _lock:
+        if _server is None and _serve_error is None:
+            try:
+                _server = ThreadingHTTPServer((host, port), _MetricsHandler)
+            except OSError as error:
+                _serve_error = error
+                print(f"solar.timing: metrics endpoint on {host}:{port} not started: {error}", file=sys.stderr)
+                return None
+            threading.Thread(target=_server.serve_forever, name="solar-metrics", daemon=True).start()
+    return _server
+
+
+# --- DEBUG PANEL ---
+def debug_enabled():
+    import streamlit as st
+
+    if st.query_params.get("debug") in ("1", "true"):
+        st.session_state["debug_timings"] = True
+    return bool(os.environ.get("SOLAR_DEBUG")) or st.session_state.get("debug_timings", False)
+
+
+def debug_panel():
+    """Per-rerun breakdown in the sidebar; call once, at the end of a page."""
+    import streamlit as st
+
+    port = os.environ.get("SOLAR_METRICS_PORT")
+    if port:
+        serve(int(port))
+    spans = take_spans()
+    if not debug_enabled():
+        return
+    with st.sidebar:
+        st.markdown("#### Rerun timings")
+        top = sum(seconds for _, seconds, depth in spans if depth == 0)
+        rows = [f"| {'&nbsp;' * 4 * depth}{name} | {seconds * 1000:,.1f} |" for name, seconds, depth in spans]
+        st.markdown("\n".join(["| span | ms |", "|---|---:|", *rows, f"| **total** | **{top * 1000:,.1f}** |"]))
+        cache = content.CACHE.stats()
+        st.caption(f"Content cache: {cache['hits']:,} hits, {cache['misses']:,} misses, "
+                   f"{cache['entries']} entries, {cache['bytes'] / 2**20:.1f} of {cache['budget_bytes'] / 2**20:.0f} MB")
+        results = resultcache.CACHE.stats()
+        st.caption(f"Result cache: {results['hits']:,} hits, {results['misses']:,} misses "
+                   f"({results['hit_rate']:.0%}), {results['writes']:,} writes, {results['evictions']:,} evicted")
+        st.download_button("Histograms (JSON)", to_json(), "timings.json", "application/json",
+                           on_click="ignore")
+        st.download_button("Histograms (Prometheus)", to_prometheus(), "timings.prom", "text/plain",
+                           on_click="ignore")